@@ -1,16 +1,48 @@
 import pandas as pd
+from typing import List, Union
 import os
-from models import MarketDataPoint
+from models import MarketDataPoint, TickBatch
+from tick_cache import load_cached_ticks
 
 # Adjust data directory to be one level above 'src'
-def load_data() -> list[MarketDataPoint]:
-    data_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
-    data_path = os.path.join(data_dir, "assignment3_market_data.csv")
+def _parse_csv(data_path: str) -> tuple:
+    df = pd.read_csv(data_path,
+                     usecols=["timestamp", "symbol", "price"],
+                     dtype={"timestamp": str, "symbol": str, "price": "float64"})
+    batch = TickBatch.from_arrays(pd.to_datetime(df["timestamp"]).to_numpy(),
+                                  df["symbol"].to_numpy(),
+                                  df["price"].to_numpy())
+    return batch.timestamps, batch.symbol_ids, batch.prices, batch.symbols
+
+
+def load_data(limit: int = None, as_batch: bool = False, use_cache: bool = False,
+              data_path: str = None) -> Union[List[MarketDataPoint], TickBatch]:
+    '''
+        Reads the csv in one typed bulk pass, parsing at most `limit` rows.
+        Returns a columnar TickBatch when as_batch is set, otherwise MarketDataPoints zipped from the column arrays.
+        With use_cache, the first run writes a binary tick file next to the csv and later runs memory-map it instead of parsing
+        (timestamps then come back as datetimes rather than strings).
+        data_path defaults to data/assignment3_market_data.csv next to 'src'.
+    '''
+    if data_path is None:
+        data_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+        data_path = os.path.join(data_dir, "assignment3_market_data.csv")
+
+    if use_cache:
+        batch = TickBatch(*load_cached_ticks(data_path, _parse_csv))[:limit]
+        return batch if as_batch else batch.to_points()
+
+    df = pd.read_csv(data_path,
+                     usecols=["timestamp", "symbol", "price"],
+                     dtype={"timestamp": str, "symbol": str, "price": "float64"},
+                     nrows=limit)
+    if as_batch:
+        return TickBatch.from_arrays(pd.to_datetime(df["timestamp"]).to_numpy(),
+                                     df["symbol"].to_numpy(),
+                                     df["price"].to_numpy())
 
-    df = pd.read_csv(data_path)
     market_data_points = [
-        MarketDataPoint(row['timestamp'], row['symbol'], row['price'])
-        for _, row in df.iterrows()
+        MarketDataPoint(timestamp, symbol, price)
+        for timestamp, symbol, price in zip(df["timestamp"].tolist(), df["symbol"].tolist(), df["price"].tolist())
     ]
     return market_data_points
-    
@@ -5,12 +5,13 @@ from strategies import NaiveMovingAverageStrategy, WindowedMovingAverageStrategy
 
 
 def main():
+    input_sizes = [1000, 10_000, 100_000]
+
     # 1. load data
-    # this will take O(n) time and O(n) space
-    data_points = load_data() # tick data points
+    # this will take O(n) time and O(n) space, n capped at the largest input size
+    data_points = load_data(limit=max(input_sizes)) # tick data points
 
     # 2. initialize strategy
-    input_sizes = [1000, 10_000, 100_000]
     strategies_info = {
         'naiveMA': {
             'strategy': NaiveMovingAverageStrategy(),
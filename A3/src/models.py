@@ -1,8 +1,66 @@
 from dataclasses import dataclass
 import datetime
+import numpy as np
 
 @dataclass(frozen=True)
 class MarketDataPoint:
     timestamp: datetime.datetime
     symbol: str
-    price: float
\ No newline at end of file
+    price: float
+
+
+class TickBatch:
+    '''
+        Struct-of-arrays tick store: timestamps as int64 nanoseconds since epoch, interned int32 symbol ids and float64 prices.
+        One million ticks take ~20 MB instead of one dataclass instance per tick.
+        MarketDataPoint row views are only built when a single tick is indexed or iterated.
+    '''
+    def __init__(self, timestamps, symbol_ids, prices, symbols):
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.symbol_ids = np.asarray(symbol_ids, dtype=np.int32)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        # symbol table : symbols[symbol_id] -> symbol string
+        self.symbols = list(symbols)
+
+    @classmethod
+    def from_arrays(cls, timestamps, symbols, prices) -> "TickBatch":
+        timestamps = np.asarray(timestamps, dtype="datetime64[ns]").astype(np.int64)
+        table, symbol_ids = np.unique(np.asarray(symbols, dtype=object).astype(str), return_inverse=True)
+        return cls(timestamps, symbol_ids, prices, table.tolist())
+
+    @classmethod
+    def from_points(cls, points) -> "TickBatch":
+        return cls.from_arrays([p.timestamp for p in points],
+                               [p.symbol for p in points],
+                               [p.price for p in points])
+
+    def to_points(self) -> list:
+        return list(self)
+
+    def symbol_id(self, symbol: str) -> int:
+        return self.symbols.index(symbol) if symbol in self.symbols else -1
+
+    def symbol_names(self) -> np.ndarray:
+        return np.asarray(self.symbols, dtype=object)[self.symbol_ids]
+
+    def select(self, symbol: str) -> "TickBatch":
+        mask = self.symbol_ids == self.symbol_id(symbol)
+        return TickBatch(self.timestamps[mask], self.symbol_ids[mask], self.prices[mask], self.symbols)
+
+    def __len__(self):
+        return len(self.prices)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return TickBatch(self.timestamps[i], self.symbol_ids[i], self.prices[i], self.symbols)
+        timestamp = self.timestamps[i].astype("datetime64[ns]").astype("datetime64[us]").item()
+        return MarketDataPoint(timestamp, self.symbols[self.symbol_ids[i]], float(self.prices[i]))
+
+    def __iter__(self, chunk_size: int = 4096):
+        # row views are built lazily, one chunk of columns at a time
+        symbols = self.symbols
+        for start in range(0, len(self), chunk_size):
+            end = start + chunk_size
+            timestamps = self.timestamps[start:end].astype("datetime64[ns]").astype("datetime64[us]").tolist()
+            for timestamp, symbol_id, price in zip(timestamps, self.symbol_ids[start:end].tolist(), self.prices[start:end].tolist()):
+                yield MarketDataPoint(timestamp, symbols[symbol_id], price)
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from collections import deque
 from functools import lru_cache
+from typing import Iterable
+import numpy as np
 
 
 class Strategy(ABC):
@@ -8,6 +10,45 @@ class Strategy(ABC):
     def generate_signals(self, tick) -> list:
         pass
 
+    def stream(self, ticks: Iterable):
+        '''
+            Consumes ticks lazily from any iterable (file reader, generator, TickBatch) and yields only the emitted signals.
+            Nothing is materialized here, so memory is bounded by the strategy's own state.
+        '''
+        for tick in ticks:
+            signal = self.generate_signals(tick)
+            if signal is not None:
+                yield signal
+
+
+def _prefix_sums(prices):
+    # prefix[i] == sum(prices[:i]), accumulated left to right like the per-tick loops
+    prefix = np.empty(len(prices) + 1, dtype=np.float64)
+    prefix[0] = 0.0
+    np.cumsum(prices, out=prefix[1:])
+    return prefix
+
+
+def _as_columns(prices, timestamps, symbols, tick_size):
+    n = len(prices) if tick_size is None else min(len(prices), tick_size)
+    prices = np.asarray(prices, dtype=np.float64)[:n]
+    timestamps = np.asarray(timestamps)[:n]
+    symbols = np.asarray(symbols)[:n]
+    return prices, timestamps, symbols
+
+
+def _signal_columns(prices, timestamps, symbols, idx, moving_avg):
+    '''
+        Columnar equivalent of the (timestamp, signal, symbol, 1, price) tuples emitted by generate_signals.
+    '''
+    return {
+        'timestamp': timestamps[idx],
+        'signal': np.sign(prices[idx] - moving_avg).astype(np.int8),
+        'symbol': symbols[idx],
+        'quantity': np.ones(len(idx), dtype=np.int64),
+        'price': prices[idx],
+    }
+
 class NaiveMovingAverageStrategy(Strategy):
     '''
         Time Complexity: O(k) per tick where k is window size. Because for each tick, we compute sum(self.__prices[-window:]).
@@ -40,6 +81,20 @@ class NaiveMovingAverageStrategy(Strategy):
             signals.append(self.generate_signals(tick))
         return signals
 
+    def run_vectorized(self, prices, timestamps, symbols, tick_size=None):
+        '''
+            Same signals as run(), computed in one NumPy pass and without the warm-up Nones.
+            The strategy's per-tick state is left untouched.
+        '''
+        prices, timestamps, symbols = _as_columns(prices, timestamps, symbols, tick_size)
+        idx = np.arange(self.__window - 1, len(prices))
+        # sum() adds each window left to right : accumulate the window's k-th prices in the same order
+        window_sum = prices[:len(idx)].copy()
+        for k in range(1, self.__window):
+            window_sum += prices[k:k + len(idx)]
+        moving_avg = window_sum / self.__window
+        return _signal_columns(prices, timestamps, symbols, idx, moving_avg)
+
 class MovingAverageStrategyMemo_Array(Strategy):
     '''
         Time Complexity: O(1) per tick. we directly access to prices using index and index - window size.
@@ -78,6 +133,25 @@ class MovingAverageStrategyMemo_Array(Strategy):
             signals.append(self.generate_signals(tick))
         return signals
 
+    def run_vectorized(self, prices, timestamps, symbols, tick_size=None):
+        '''
+            Same signals as run(), computed in one NumPy pass and without the warm-up Nones.
+            Mirrors generate_signals, whose running window_sum holds the latest window - 1 prices.
+        '''
+        prices, timestamps, symbols = _as_columns(prices, timestamps, symbols, tick_size)
+        window = self.__window
+        n = len(prices)
+        idx = np.arange(window - 1, n)
+        # replay window_sum's exact operation order : the first window - 1 prices, then per tick += (price - oldest)
+        head = prices[:window - 1]
+        steps = np.empty(len(head) + len(idx), dtype=np.float64)
+        steps[:len(head)] = head
+        steps[len(head):] = prices[window - 1:] - prices[:len(idx)]
+        # running[t] is window_sum after tick t
+        running = np.cumsum(steps)
+        moving_avg = running[window - 1:] / window
+        return _signal_columns(prices, timestamps, symbols, idx, moving_avg)
+
 
 class MovingAverageStrategyMemo_LRUCache(Strategy):
     '''
@@ -116,6 +190,28 @@ class MovingAverageStrategyMemo_LRUCache(Strategy):
             signals.append(self.generate_signals(datapoints[i]))
         return signals
 
+    def stream(self, ticks: Iterable):
+        '''
+            Streaming version of run(): only the latest window + 1 prefix sums are kept instead of caching one per tick.
+            Space Complexity: O(window).
+        '''
+        prefix = deque([0], maxlen=self.__window + 1)
+        for tick in ticks:
+            if len(prefix) == self.__window + 1:
+                self.__moving_avg = (prefix[-1] - prefix[0]) / self.__window
+                yield self.generate_signals(tick)
+            prefix.append(prefix[-1] + tick.price)
+
+    def run_vectorized(self, prices, timestamps, symbols, tick_size=None):
+        '''
+            Same signals as run(): the prefix sums are the cached prefix_sum values, built with np.cumsum.
+        '''
+        prices, timestamps, symbols = _as_columns(prices, timestamps, symbols, tick_size)
+        prefix = _prefix_sums(prices)
+        idx = np.arange(self.__window, len(prices))
+        moving_avg = (prefix[idx] - prefix[idx - self.__window]) / self.__window
+        return _signal_columns(prices, timestamps, symbols, idx, moving_avg)
+
 class WindowedMovingAverageStrategy(Strategy):
     '''
         Time Complexity: O(1) per tick : Because the moving average is updated incrementally without recalculation of the sum.
@@ -151,6 +247,24 @@ class WindowedMovingAverageStrategy(Strategy):
             tick = datapoints[i]
             signals.append(self.generate_signals(tick))
         return signals
+
+    def run_vectorized(self, prices, timestamps, symbols, tick_size=None):
+        '''
+            Same signals as run(), computed in one NumPy pass and without the warm-up Nones.
+            The strategy's deque and running sum are left untouched.
+        '''
+        prices, timestamps, symbols = _as_columns(prices, timestamps, symbols, tick_size)
+        window = self.__window
+        idx = np.arange(window - 1, len(prices))
+        # replay the running sum's exact operation order : the first window prices, then per tick -oldest, +price
+        head = prices[:window]
+        steps = np.empty(len(head) + 2 * max(len(prices) - window, 0), dtype=np.float64)
+        steps[:len(head)] = head
+        steps[window::2] = -prices[:max(len(prices) - window, 0)]
+        steps[window + 1::2] = prices[window:]
+        running = np.cumsum(steps)
+        moving_avg = running[window - 1::2][:len(idx)] / window
+        return _signal_columns(prices, timestamps, symbols, idx, moving_avg)
     
     
 ## Execution Sample Test
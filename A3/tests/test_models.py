@@ -1,7 +1,8 @@
 import pytest
+import numpy as np
 from src.data_loader import load_data
 import datetime
-from src.models import MarketDataPoint
+from src.models import MarketDataPoint, TickBatch
 from src.strategies import NaiveMovingAverageStrategy, WindowedMovingAverageStrategy, MovingAverageStrategyMemo_Array, MovingAverageStrategyMemo_LRUCache
 from src.profiler import calculate_profile
 
@@ -142,3 +143,129 @@ def test_expected_hotspots():
 
 
 
+def test_vectorized_matches_run():
+    prices = [150.0, 151.0, 149.0, 150.0, 150.0, 152.0, 148.0, 150.0, 150.0, 151.0, 149.5, 150.5]
+    market_data = [
+        MarketDataPoint(timestamp=datetime.datetime(2025, 1, 1, 9, 30, i), symbol='AAPL', price=p)
+        for i, p in enumerate(prices)
+    ]
+    timestamps = [tick.timestamp for tick in market_data]
+    symbols = [tick.symbol for tick in market_data]
+
+    for strategy_cls in [NaiveMovingAverageStrategy, MovingAverageStrategyMemo_Array,
+                         MovingAverageStrategyMemo_LRUCache, WindowedMovingAverageStrategy]:
+        expected = [s for s in strategy_cls(window=4).run(market_data, tick_size=100) if s is not None]
+        columns = strategy_cls(window=4).run_vectorized(prices, timestamps, symbols)
+
+        vectorized = list(zip(columns['timestamp'], columns['signal'], columns['symbol'],
+                              columns['quantity'], columns['price']))
+        assert vectorized == expected
+
+
+def test_vectorized_matches_run_on_long_series_with_ties():
+    # prices on a 0.01 grid : many ticks sit exactly on their moving average, where rounding decides the signal
+    rng = np.random.default_rng(7)
+    tick_walk = np.round(100 + np.cumsum(rng.integers(-2, 3, 20000)) * 0.01, 2)
+    normal_walk = np.round(np.abs(50 + np.cumsum(np.random.default_rng(1).normal(0, 0.5, 20000))), 2)
+    start = datetime.datetime(2025, 1, 1, 9, 30)
+
+    for prices in [tick_walk, normal_walk]:
+        market_data = [MarketDataPoint(timestamp=start + datetime.timedelta(seconds=i), symbol='AAPL', price=float(p))
+                       for i, p in enumerate(prices)]
+        timestamps = [tick.timestamp for tick in market_data]
+        symbols = [tick.symbol for tick in market_data]
+
+        for window in [5, 20, 60]:
+            for strategy_cls in [NaiveMovingAverageStrategy, MovingAverageStrategyMemo_Array,
+                                 MovingAverageStrategyMemo_LRUCache, WindowedMovingAverageStrategy]:
+                expected = [s[1] for s in strategy_cls(window=window).run(market_data, tick_size=len(prices))
+                            if s is not None]
+                columns = strategy_cls(window=window).run_vectorized(prices, timestamps, symbols)
+                assert columns['signal'].tolist() == expected
+
+
+def test_vectorized_matches_run_on_short_series():
+    # fewer prices than the window (or just enough for one signal) : run() only returns Nones there
+    start = datetime.datetime(2025, 1, 1, 9, 30)
+    for n in range(0, 12):
+        prices = [150.0 + (i % 3) for i in range(n)]
+        market_data = [MarketDataPoint(timestamp=start + datetime.timedelta(seconds=i), symbol='AAPL', price=p)
+                       for i, p in enumerate(prices)]
+        timestamps = [tick.timestamp for tick in market_data]
+        symbols = [tick.symbol for tick in market_data]
+
+        for strategy_cls in [NaiveMovingAverageStrategy, MovingAverageStrategyMemo_Array,
+                             MovingAverageStrategyMemo_LRUCache, WindowedMovingAverageStrategy]:
+            expected = [s[1] for s in strategy_cls(window=10).run(market_data, tick_size=100) if s is not None]
+            columns = strategy_cls(window=10).run_vectorized(prices, timestamps, symbols)
+            assert columns['signal'].tolist() == expected
+
+
+def test_strategies_accept_tick_batch():
+    market_data = [
+        MarketDataPoint(timestamp=datetime.datetime(2025, 1, 1, 9, 30, i), symbol='AAPL', price=150.0 + (i % 3))
+        for i in range(10)
+    ]
+    batch = TickBatch.from_points(market_data)
+    assert batch.to_points() == market_data
+
+    for strategy_cls in [NaiveMovingAverageStrategy, MovingAverageStrategyMemo_Array,
+                         MovingAverageStrategyMemo_LRUCache, WindowedMovingAverageStrategy]:
+        expected = strategy_cls(window=3).run(market_data, tick_size=100)
+        assert strategy_cls(window=3).run(batch, tick_size=100) == expected
+
+
+def _write_market_data(path, n):
+    start = datetime.datetime(2025, 1, 1, 9, 30)
+    rows = [f"{start + datetime.timedelta(seconds=i // 2)},{'AAPL' if i % 2 else 'MSFT'},{100 + (i % 7) * 0.25}"
+            for i in range(n)]
+    path.write_text("timestamp,symbol,price\n" + "\n".join(rows) + "\n")
+    return rows
+
+
+def test_load_data_limit_and_batch(tmp_path):
+    data_path = tmp_path / "market_data.csv"
+    rows = _write_market_data(data_path, 50)
+
+    data_points = load_data(limit=20, data_path=str(data_path))
+    batch = load_data(limit=20, as_batch=True, data_path=str(data_path))
+
+    assert len(data_points) == len(batch) == 20
+    # the first `limit` rows, timestamps kept as the csv strings
+    assert [f"{p.timestamp},{p.symbol},{p.price}" for p in data_points] == rows[:20]
+    assert [p.price for p in data_points] == batch.prices.tolist()
+    assert [p.symbol for p in data_points] == batch.symbol_names().tolist()
+    assert len(load_data(data_path=str(data_path))) == 50
+
+
+def test_load_data_binary_cache(tmp_path):
+    data_path = tmp_path / "market_data.csv"
+    _write_market_data(data_path, 50)
+    expected = load_data(as_batch=True, data_path=str(data_path))
+
+    # first call parses and writes the cache, the second memory-maps it
+    for _ in range(2):
+        cached = load_data(as_batch=True, use_cache=True, data_path=str(data_path))
+        assert cached.timestamps.tolist() == expected.timestamps.tolist()
+        assert cached.prices.tolist() == expected.prices.tolist()
+        assert cached.symbol_names().tolist() == expected.symbol_names().tolist()
+    assert (tmp_path / "market_data.csv.ticks").exists()
+    assert len(load_data(limit=20, use_cache=True, data_path=str(data_path))) == 20
+
+    # appending rows changes the csv size : the cache is rebuilt
+    _write_market_data(data_path, 60)
+    assert len(load_data(use_cache=True, data_path=str(data_path))) == 60
+
+
+def test_stream_yields_only_signals():
+    market_data = [
+        MarketDataPoint(timestamp=datetime.datetime(2025, 1, 1, 9, 30, i), symbol='AAPL', price=150.0 + (i % 4))
+        for i in range(20)
+    ]
+
+    for strategy_cls in [NaiveMovingAverageStrategy, MovingAverageStrategyMemo_Array,
+                         MovingAverageStrategyMemo_LRUCache, WindowedMovingAverageStrategy]:
+        expected = [s for s in strategy_cls(window=5).run(market_data, tick_size=100) if s is not None]
+        # feed a generator so nothing can be indexed
+        streamed = strategy_cls(window=5).stream(tick for tick in market_data)
+        assert list(streamed) == expected
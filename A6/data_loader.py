@@ -4,7 +4,8 @@ import pandas as pd
 import csv
 from abc import ABC, abstractmethod
 from datetime import datetime
-from models import MarketDataPoint
+from models import MarketDataPoint, TickBatch
+from tick_cache import load_cached_ticks
 
 
 '''
@@ -45,12 +46,21 @@ class CSVAdapter(MarketDataSource):
                 instruments.append(data)
         return instruments
     
-    def get_market_data(self):
+    def get_market_data(self, as_batch: bool = False, use_cache: bool = False):
         data_dir = self.get_directory_path()
         data_path = os.path.join(data_dir, "market_data.csv")
         if not os.path.exists(data_path):
             raise FileNotFoundError(f"CSV file not found: {data_path}")
 
+        if use_cache:
+            # binary tick file next to the csv, memory-mapped on every run after the first
+            batch = TickBatch(*load_cached_ticks(data_path, self._parse_market_data))
+            return batch if as_batch else batch.to_points()
+
+        if as_batch:
+            # columnar load : no MarketDataPoint is built per row
+            return TickBatch(*self._parse_market_data(data_path))
+
         market_data = []
         with open(data_path, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
@@ -63,6 +73,14 @@ class CSVAdapter(MarketDataSource):
                 market_data.append(data_point)
         return market_data
 
+    @staticmethod
+    def _parse_market_data(data_path):
+        df = pd.read_csv(data_path, dtype={"symbol": str, "price": "float64"})
+        batch = TickBatch.from_arrays(pd.to_datetime(df["timestamp"], format="%Y-%m-%d %H:%M:%S").to_numpy(),
+                                      df["symbol"].to_numpy(),
+                                      df["price"].to_numpy())
+        return batch.timestamps, batch.symbol_ids, batch.prices, batch.symbols
+
 
 class BloombergXMLAdapter(MarketDataSource):
     def get_data(self, symbol) -> MarketDataPoint:
@@ -1,52 +1,222 @@
-from typing import Dict, List
-from models import MarketDataPoint
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Union
+import numpy as np
+from models import MarketDataPoint, TickBatch
 from patterns.strategies import Strategy
 from patterns.builder_pattern import Portfolio, PortfolioBuilder
+from patterns.observers import SignalPublisher
+
+_COLUMNS = [("timestamps", np.int64), ("symbol_ids", np.int32), ("prices", np.float64)]
+
+
+def _run_shard(shm_names: dict, length: int, symbols: list, shard: list, strategy_specs: dict) -> dict:
+    """
+    worker : attach the shared tick columns and generate signals for the (symbol, start, end) ranges of its shard
+    every symbol gets fresh strategy instances built from the same class and params
+    """
+    # pool workers share the parent's resource tracker, so attaching here never unlinks the parent's blocks
+    blocks = {column: shared_memory.SharedMemory(name=shm_names[column]) for column, _ in _COLUMNS}
+    try:
+        arrays = {column: np.ndarray((length,), dtype=dtype, buffer=blocks[column].buf) for column, dtype in _COLUMNS}
+        batch = TickBatch(arrays["timestamps"], arrays["symbol_ids"], arrays["prices"], symbols)
+
+        results = {}
+        for symbol, start, end in shard:
+            symbol_data = batch[start:end]
+            all_signals = {}
+            for strategy_name, (strategy_cls, params) in strategy_specs.items():
+                strategy = strategy_cls(params, SignalPublisher())
+                if hasattr(strategy, "run_batch"):
+                    all_signals[strategy_name] = strategy.run_batch(symbol_data.prices, symbol)
+                else:
+                    all_signals[strategy_name] = list(strategy.stream(symbol_data))
+            results[symbol] = all_signals
+        # drop the views before closing the blocks they point into
+        del batch, arrays, symbol_data
+        return results
+    finally:
+        for shm in blocks.values():
+            shm.close()
 
 class ExecutionEngine:
-    def __init__(self, market_data: List[MarketDataPoint], strategies: dict):
+    def __init__(self, market_data: Union[List[MarketDataPoint], TickBatch], strategies: dict):
         """
         market_data: csv file itself : contail mixed symbols
+                     either a list of MarketDataPoint or a columnar TickBatch
         """
         self.strategies: Dict[str, Strategy] = strategies
         self.portfolio: Dict[str, dict] = {}
 
+        # strategy_name -> symbol -> position dict; the dicts are the same objects held in portfolio["positions"]
+        self.position_index: Dict[str, Dict[str, dict]] = {}
+
         for strategy_name, strategy in self.strategies.items():
             builder = PortfolioBuilder(f"{strategy_name} Portfolio", owner="group8")
             self.portfolio[strategy_name] = builder.build()
+            self.position_index[strategy_name] = {p["symbol"]: p for p in self.portfolio[strategy_name]["positions"]}
 
         self.market_data = market_data
+        # one-time symbol -> row indices partition, so a symbol lookup never rescans the whole market data
+        self.symbol_index: Dict[str, List[int]] = self._build_symbol_index(market_data)
+
+    @staticmethod
+    def _build_symbol_index(market_data) -> dict:
+        if isinstance(market_data, TickBatch):
+            return market_data.group_indices()
+
+        index = {}
+        for i, tick in enumerate(market_data):
+            index.setdefault(tick.symbol, []).append(i)
+        return index
+
+    def _symbol_data(self, symbol: str):
+        idx = self.symbol_index.get(symbol, [])
+        if isinstance(self.market_data, TickBatch):
+            # columnar slice; rows are only built lazily if a strategy needs them
+            return self.market_data[np.asarray(idx, dtype=np.int64)]
+        return [self.market_data[i] for i in idx]
 
     def generate_all_signals(self, symbol: str):
         """
         set specific symbol and generate signals
         """
         all_signals = {}
-        symbol_data = [tick for tick in self.market_data if tick.symbol == symbol]
+        symbol_data = self._symbol_data(symbol)
 
         for strategy_name, strategy in self.strategies.items():
-            signals = []
-            for tick in symbol_data:
-                sig = strategy.generate_signals(tick)
-                if sig: 
-                    signals.append(sig)
-            all_signals[strategy_name] = signals
+            if isinstance(symbol_data, TickBatch) and hasattr(strategy, "run_batch"):
+                all_signals[strategy_name] = strategy.run_batch(symbol_data.prices, symbol)
+            else:
+                all_signals[strategy_name] = list(strategy.stream(symbol_data))
 
         return all_signals
 
+    def generate_all_signals_for(self, symbols: List[str] = None) -> Dict[str, dict]:
+        """
+        generate signals for every symbol (all indexed symbols by default) in one pass over the partitioned data
+        returns {symbol: {strategy_name: signals}}, same as calling generate_all_signals per symbol in order
+        """
+        if symbols is None:
+            symbols = list(self.symbol_index)
+        return {symbol: self.generate_all_signals(symbol) for symbol in symbols}
+
 
     def apply_signals_to_portfolio(self, strategy_name, signals):
         portfolio = self.portfolio[strategy_name]
         positions = portfolio.get("positions", [])
+        index = self.position_index[strategy_name]
 
         for sig in signals:
-            existing = next((p for p in positions if p["symbol"] == sig["symbol"]), None)
+            existing = index.get(sig["symbol"])
             if existing:
                 total_qty = existing["quantity"] + sig["qty"]
                 existing["price"] = round((existing["price"]*existing["quantity"] + sig["price"]*sig["qty"])/total_qty, 4)
                 existing["quantity"] = total_qty
             else:
-                positions.append({"symbol": sig["symbol"], "quantity": sig["qty"], "price": sig["price"]})
+                position = {"symbol": sig["symbol"], "quantity": sig["qty"], "price": sig["price"]}
+                positions.append(position)
+                index[sig["symbol"]] = position
+
+        portfolio["positions"] = positions
+        self.portfolio[strategy_name] = portfolio
+
+    def apply_signals_bulk(self, strategy_name, signals):
+        """
+        aggregate quantity and VWAP per symbol with a NumPy group-by, then apply one update per symbol
+        the VWAP is rounded once per symbol instead of after every signal, so prices can differ from
+        apply_signals_to_portfolio in the 4th decimal
+        """
+        if not signals:
+            return
+
+        symbols = np.array([sig["symbol"] for sig in signals], dtype=object)
+        qty = np.array([sig["qty"] for sig in signals], dtype=np.float64)
+        price = np.array([sig["price"] for sig in signals], dtype=np.float64)
+
+        unique, first, inverse = np.unique(symbols, return_index=True, return_inverse=True)
+        total_qty = np.bincount(inverse, weights=qty)
+        notional = np.bincount(inverse, weights=qty * price)
+
+        portfolio = self.portfolio[strategy_name]
+        positions = portfolio.get("positions", [])
+        index = self.position_index[strategy_name]
+
+        # new positions are appended in order of first appearance, as in the per-signal path
+        for g in np.argsort(first, kind="stable"):
+            symbol = unique[g]
+            qty_sum = total_qty[g].item()
+            if float(qty_sum).is_integer():
+                qty_sum = int(qty_sum)
+
+            existing = index.get(symbol)
+            if existing:
+                new_qty = existing["quantity"] + qty_sum
+                existing["price"] = round((existing["price"]*existing["quantity"] + notional[g].item())/new_qty, 4)
+                existing["quantity"] = new_qty
+            else:
+                position = {"symbol": symbol, "quantity": qty_sum, "price": round(notional[g].item()/qty_sum, 4)}
+                positions.append(position)
+                index[symbol] = position
 
         portfolio["positions"] = positions
         self.portfolio[strategy_name] = portfolio
+
+    def run_parallel(self, symbols: List[str] = None, max_workers: int = None) -> Dict[str, dict]:
+        """
+        shard symbols across a ProcessPoolExecutor and merge the signals back into self.portfolio
+        ticks are published once in shared memory, sorted by symbol, so each worker only receives row ranges
+        unlike the serial path, every symbol starts from fresh strategy state (built from the strategies' params)
+        and the strategies' publishers are notified in the parent after the merge
+        """
+        if symbols is None:
+            symbols = list(self.symbol_index)
+        batch = self.market_data if isinstance(self.market_data, TickBatch) else TickBatch.from_points(self.market_data)
+        groups = batch.group_indices()
+
+        # lay the ticks out symbol by symbol : each symbol is a contiguous [start, end) range
+        order, ranges, offset = [], {}, 0
+        for symbol in symbols:
+            idx = groups.get(symbol, np.empty(0, dtype=np.int64))
+            order.append(idx)
+            ranges[symbol] = (offset, offset + len(idx))
+            offset += len(idx)
+        order = np.concatenate(order) if order else np.empty(0, dtype=np.int64)
+
+        max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(symbols)))
+        # greedy balance by row count : largest symbols first, each to the lightest shard
+        shards, loads = [[] for _ in range(max_workers)], [0] * max_workers
+        for symbol in sorted(symbols, key=lambda s: ranges[s][0] - ranges[s][1]):
+            k = loads.index(min(loads))
+            shards[k].append((symbol, *ranges[symbol]))
+            loads[k] += ranges[symbol][1] - ranges[symbol][0]
+
+        strategy_specs = {name: (type(strategy), strategy.params) for name, strategy in self.strategies.items()}
+        length = len(order)
+        blocks = {}
+        try:
+            for column, dtype in _COLUMNS:
+                shm = shared_memory.SharedMemory(create=True, size=max(1, length * np.dtype(dtype).itemsize))
+                blocks[column] = shm
+                np.ndarray((length,), dtype=dtype, buffer=shm.buf)[:] = getattr(batch, column)[order]
+            shm_names = {column: shm.name for column, shm in blocks.items()}
+
+            results = {}
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(_run_shard, shm_names, length, batch.symbols, shard, strategy_specs)
+                           for shard in shards if shard]
+                for future in futures:
+                    results.update(future.result())
+        finally:
+            for shm in blocks.values():
+                shm.close()
+                shm.unlink()
+
+        all_signals = {symbol: results[symbol] for symbol in symbols}
+        for symbol, signals_by_strategy in all_signals.items():
+            for strategy_name, signals in signals_by_strategy.items():
+                for sig in signals:
+                    self.strategies[strategy_name].publisher.notify(sig)
+                self.apply_signals_to_portfolio(strategy_name, signals)
+        return all_signals
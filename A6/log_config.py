@@ -0,0 +1,94 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+from threading import Lock
+from patterns.singleton_pattern import Config
+
+# parent of every logger in the project : a6.signals, a6.alerts, a6.broker, a6.report, a6.report.signals
+LOGGER_NAME = "a6"
+# per-signal events, sampled when sample_every > 1 ; one filter (and counter) per logger, so observers attached
+# to the same publisher are each sampled one in every N instead of aliasing on a shared counter
+SIGNAL_LOGGERS = ("a6.signals", "a6.report.signals")
+
+FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s"
+
+_listener = None
+_lock = Lock()
+
+
+class SampleFilter(logging.Filter):
+    """
+    keeps one record out of every `every` at or below max_level ; more severe records always pass
+    """
+    def __init__(self, every: int, max_level: int = logging.INFO):
+        super().__init__()
+        self.every = every
+        self.max_level = max_level
+        self.seen = {}
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+        # counted per logger name in case the filter is shared
+        seen = self.seen.get(record.name, 0)
+        self.seen[record.name] = seen + 1
+        return seen % self.every == 0
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    # the stock prepare() formats the message in the caller's thread ; leave msg % args to the listener
+    def prepare(self, record):
+        return record
+
+
+def setup_logging(level=None, sample_every: int = None, stream=None) -> logging.handlers.QueueListener:
+    """
+    routes the a6 loggers through a queue to a background listener thread that formats and writes them,
+    so a log call on the tick path only builds a record and enqueues it
+    level / sample_every default to log_level / log_sample_every of config.json ; stream defaults to stdout
+    calling it again replaces the previous setup
+    """
+    global _listener
+    settings = Config().settings["config"]
+    level = level if level is not None else settings.get("log_level", "INFO")
+    sample_every = sample_every if sample_every is not None else settings.get("log_sample_every", 1)
+
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+
+        records = queue.SimpleQueue()
+        output = logging.StreamHandler(stream if stream is not None else sys.stdout)
+        output.setFormatter(logging.Formatter(FORMAT))
+
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.setLevel(level)
+        logger.handlers = [_LazyQueueHandler(records)]
+        logger.propagate = False
+
+        for name in SIGNAL_LOGGERS:
+            logging.getLogger(name).filters = [SampleFilter(sample_every)] if sample_every > 1 else []
+
+        _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+        _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    # flushes the queue, stops the listener thread and hands the a6 loggers back to the root logger
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+            logger = logging.getLogger(LOGGER_NAME)
+            logger.handlers = []
+            logger.propagate = True
+            logger.setLevel(logging.NOTSET)
+            for name in SIGNAL_LOGGERS:
+                logging.getLogger(name).filters = []
+
+
+atexit.register(shutdown_logging)
@@ -4,6 +4,7 @@ from analytics import BetaDecorator, DrawdownDecorator, VolatilityDecorator
 from data_loader import CSVAdapter
 from patterns.factory_pattern import InstrumentFactory
 from patterns.singleton_pattern import Config
+from log_config import setup_logging
 from patterns.strategies import MeanReversionStrategy, BreakoutStrategy
 from patterns.observers import SignalPublisher, LoggerObserver, AlertObserver
 from patterns.commands import ExecuteOrderCommand, Broker, UndoOrderCommand
@@ -17,6 +18,8 @@ SYMBOLS = ["AAPL", "MSFT", "US10Y", "SPY"]
 # Load configuration
 cfg = Config()       
 config = cfg.settings 
+# observers, broker and reporter log through a background writer at config.json's log_level
+setup_logging()
 
 # Load toy data using CSVAdapter
 csv_adapter = CSVAdapter()
@@ -39,7 +42,7 @@ stock_prices = [AAPL_stock.price, MSFT_stock.price]
 decorated = DrawdownDecorator(BetaDecorator(VolatilityDecorator(lambda: stock_prices)))
 print('decorated: ', decorated())
 # Load market data using CSVAdapter
-market_data = csv_adapter.get_market_data()
+market_data = csv_adapter.get_market_data(use_cache=True)
 # print(market_data)
 
 
@@ -1,4 +1,7 @@
 from abc import ABC, abstractmethod
+import logging
+
+broker_log = logging.getLogger("a6.broker")
 
 class OrderCommand(ABC):
     @abstractmethod
@@ -16,12 +19,12 @@ class Broker():
     def execute_order(self,side,symbol,qty,price):
         self.trades.append((side,symbol,qty,price))
         label = "BUY" if side == 1 else "SELL"
-        print(f"[BROKER] EXECUTED {label} signal for {qty} {symbol} at {price}")
+        broker_log.info("[BROKER] EXECUTED %s signal for %s %s at %s", label, qty, symbol, price)
 
     def reverse_order(self,side,symbol,qty,price):
         self.trades.append((-side,symbol,qty,price))
         label = "BUY" if side == 1 else "SELL"
-        print(f"[BROKER] REVERSED {label} signal for {qty} {symbol} at {price}")
+        broker_log.info("[BROKER] REVERSED %s signal for %s %s at %s", label, qty, symbol, price)
 
 
 class ExecuteOrderCommand(OrderCommand):
@@ -1,30 +1,200 @@
 from collections import deque
+import logging
+import threading
+import time
 import numpy as np
 
+signal_log = logging.getLogger("a6.signals")
+alert_log = logging.getLogger("a6.alerts")
+
 class Observer():
     def update(self, signal:dict):
         pass
 
+    def update_batch(self, signals: list):
+        # batched publishers deliver a list of signals at once; override to handle them in one go
+        for signal in signals:
+            self.update(signal)
+
+
+POLICIES = ("block", "drop_oldest", "coalesce")
+
+
 class SignalPublisher():
-    def __init__(self):
+    """
+    default : notify calls every observer's update synchronously
+    batched=True : notify only enqueues into a ring buffer of `capacity` signals and a background thread
+    delivers them to the observers in batches of up to `batch_size` (update_batch when the observer has it)
+    policy when the buffer is full :
+        block       - notify waits for room
+        drop_oldest - the oldest pending signal is discarded
+        coalesce    - the latest pending signal with the same (strategy, symbol) is replaced by the newer one,
+                      waits for room otherwise ; below capacity every signal is queued
+    """
+    def __init__(self, batched: bool = False, capacity: int = 1024, batch_size: int = 256, policy: str = "block"):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}")
         self.__observers=[]
+        self.__batched = batched
+        self.__capacity = capacity
+        self.__batch_size = batch_size
+        self.__policy = policy
+
+        # pending (enqueue time, key) in arrival order, key -> signal, (strategy, symbol) -> key of its latest pending signal
+        self.__buffer = deque()
+        self.__pending = {}
+        self.__latest = {}
+        self.__seq = 0
+        self.__in_flight = 0
+        self.__closed = False
+        self.__error = None
+        self.__counters = {"published": 0, "delivered": 0, "dropped": 0, "coalesced": 0}
+        self.__observer_stats = {}
+        self.__cond = threading.Condition()
+        self.__thread = None
+        if batched:
+            self.__thread = threading.Thread(target=self.__run, daemon=True)
+            self.__thread.start()
 
     def attach(self, observer: Observer):
         self.__observers.append(observer)
+        self.__observer_stats[id(observer)] = {"observer": type(observer).__name__, "signals": 0, "batches": 0,
+                                               "busy_s": 0.0, "latency_sum_s": 0.0, "max_latency_s": 0.0}
 
     def notify(self, signal: dict):
-        for observer in self.__observers:
-            observer.update(signal)
+        if not self.__batched:
+            for observer in self.__observers:
+                observer.update(signal)
+            return
+
+        with self.__cond:
+            self.__counters["published"] += 1
+            pair = (signal.get("strategy"), signal.get("symbol"))
+
+            while True:
+                if self.__closed:
+                    raise RuntimeError("publisher is closed")
+                if len(self.__buffer) < self.__capacity:
+                    break
+                if self.__policy == "drop_oldest":
+                    _, oldest = self.__buffer.popleft()
+                    self.__forget(oldest)
+                    self.__counters["dropped"] += 1
+                elif self.__policy == "coalesce" and pair in self.__latest:
+                    # keeps its place in the queue (and its enqueue time), only the payload is newer
+                    self.__pending[self.__latest[pair]] = signal
+                    self.__counters["coalesced"] += 1
+                    return
+                else:
+                    self.__cond.wait()
+
+            key = self.__seq
+            self.__seq += 1
+            self.__buffer.append((time.perf_counter(), key))
+            self.__pending[key] = signal
+            self.__latest[pair] = key
+            self.__cond.notify_all()
+
+    def __forget(self, key):
+        # removes a signal leaving the buffer, returns it
+        signal = self.__pending.pop(key)
+        pair = (signal.get("strategy"), signal.get("symbol"))
+        if self.__latest.get(pair) == key:
+            del self.__latest[pair]
+        return signal
+
+    def __take(self) -> list:
+        # up to batch_size (enqueue time, signal), None once closed and drained
+        with self.__cond:
+            while not self.__buffer and not self.__closed:
+                self.__cond.wait()
+            if not self.__buffer:
+                return None
+            batch = []
+            while self.__buffer and len(batch) < self.__batch_size:
+                enqueued, key = self.__buffer.popleft()
+                batch.append((enqueued, self.__forget(key)))
+            self.__in_flight = len(batch)
+            # room in the buffer for blocked producers
+            self.__cond.notify_all()
+            return batch
+
+    def __run(self):
+        while True:
+            batch = self.__take()
+            if batch is None:
+                return
+            signals = [signal for _, signal in batch]
+            oldest = batch[0][0]
+            for observer in self.__observers:
+                stats = self.__observer_stats[id(observer)]
+                start = time.perf_counter()
+                try:
+                    if hasattr(observer, "update_batch"):
+                        observer.update_batch(signals)
+                    else:
+                        for signal in signals:
+                            observer.update(signal)
+                except Exception as e:
+                    # reported by flush/close, the other observers still get the batch
+                    if self.__error is None:
+                        self.__error = e
+                done = time.perf_counter()
+                stats["signals"] += len(signals)
+                stats["batches"] += 1
+                stats["busy_s"] += done - start
+                stats["latency_sum_s"] += sum(done - enqueued for enqueued, _ in batch)
+                stats["max_latency_s"] = max(stats["max_latency_s"], done - oldest)
+            with self.__cond:
+                self.__counters["delivered"] += len(batch)
+                self.__in_flight = 0
+                self.__cond.notify_all()
+
+    def flush(self):
+        # wait until every pending signal has been delivered
+        if self.__batched:
+            with self.__cond:
+                while (self.__buffer or self.__in_flight) and self.__thread.is_alive():
+                    self.__cond.wait()
+        if self.__error is not None:
+            error, self.__error = self.__error, None
+            raise error
+
+    def close(self):
+        if self.__batched and not self.__closed:
+            with self.__cond:
+                self.__closed = True
+                self.__cond.notify_all()
+            self.__thread.join()
+        self.flush()
+
+    def stats(self) -> dict:
+        # counters, plus per observer : signals, batches, time spent in the observer, queue-to-delivery latency
+        with self.__cond:
+            observers = []
+            for observer in self.__observers:
+                stats = dict(self.__observer_stats[id(observer)])
+                stats["mean_latency_s"] = stats.pop("latency_sum_s") / stats["signals"] if stats["signals"] else 0.0
+                observers.append(stats)
+            return {**self.__counters, "pending": len(self.__buffer), "observers": observers}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
 
 class LoggerObserver(Observer):
     def update(self, signal):
-        print(f"[LOGGER] {signal['strategy']} emits signal {signal['signal']} at {signal['price']} on {signal['symbol']}")
+        signal_log.info("[LOGGER] %s emits signal %s at %s on %s",
+                        signal['strategy'], signal['signal'], signal['price'], signal['symbol'])
 
 class AlertObserver(Observer):
     def update(self, signal):
         if abs(signal['signal']) == 1 and signal['qty']> 1:
-            print(f"[ALERT] LARGE TRADE involving {signal['strategy']}: emits {signal['signal']} signal for {signal['qty']} units at {signal['price']} ")
+            alert_log.warning("[ALERT] LARGE TRADE involving %s: emits %s signal for %s units at %s",
+                              signal['strategy'], signal['signal'], signal['qty'], signal['price'])
 
 
 
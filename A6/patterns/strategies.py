@@ -4,7 +4,66 @@ from models import MarketDataPoint
 import os
 import pandas as pd
 from collections import deque
+import math
+from typing import Iterable
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+class RollingExtrema:
+    """
+    rolling max/min of the last `window` pushed values, kept in monotonic deques
+    each value enters and leaves each deque once : O(1) amortized per push, no array allocation
+    """
+    def __init__(self, window: int):
+        self.__window = window
+        self.__count = 0
+        self.__max = deque()  # (index, value) with decreasing values
+        self.__min = deque()  # (index, value) with increasing values
+
+    def push(self, value):
+        index = self.__count
+        self.__count += 1
+
+        while self.__max and self.__max[-1][1] <= value:
+            self.__max.pop()
+        self.__max.append((index, value))
+        while self.__min and self.__min[-1][1] >= value:
+            self.__min.pop()
+        self.__min.append((index, value))
+
+        # drop the value that just slid out of the window
+        expired = index - self.__window
+        if self.__max[0][0] <= expired:
+            self.__max.popleft()
+        if self.__min[0][0] <= expired:
+            self.__min.popleft()
+
+    def max(self):
+        return self.__max[0][1]
+
+    def min(self):
+        return self.__min[0][1]
+
+
+def _rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    # van Herk / Gil-Werman : block-wise prefix and suffix maxima, O(n) whatever the window
+    n = len(values)
+    blocks = np.concatenate([values, np.full(-n % window, -np.inf)]).reshape(-1, window)
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    start = np.arange(n - window + 1)
+    return np.maximum(suffix[start], prefix[start + window - 1])
+
+
+def rolling_extrema(values, window: int) -> tuple:
+    """
+    batch counterpart of RollingExtrema : (max, min) of values[k:k + window] for every full window k
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < window:
+        return np.empty(0), np.empty(0)
+    return _rolling_max(values, window), -_rolling_max(-values, window)
+
 
 class Strategy(ABC):
     def __init__(self, params, publisher):
@@ -15,6 +74,15 @@ class Strategy(ABC):
     def generate_signals(self):
         pass
 
+    def stream(self, ticks: Iterable):
+        """
+        consume ticks lazily and yield only the emitted signals (warm-up 0s and None are skipped)
+        """
+        for tick in ticks:
+            signal = self.generate_signals(tick)
+            if signal:
+                yield signal
+
 class MeanReversionStrategy(Strategy):
 
     def __init__(self, params, publisher):
@@ -22,19 +90,55 @@ class MeanReversionStrategy(Strategy):
         self.__threshold = params["threshold"]
         self.__window = params["lookback_window"]
         self.__prices = deque(maxlen=self.__window)
+        # Kahan-compensated running sum of the window, recomputed exactly every `window` updates to bound drift
+        self.__sum = 0.0
+        self.__compensation = 0.0
+        self.__updates = 0
+
+    def __add(self, value):
+        y = value - self.__compensation
+        total = self.__sum + y
+        self.__compensation = (total - self.__sum) - y
+        self.__sum = total
+
+    def __resync(self):
+        self.__sum = math.fsum(self.__prices)
+        self.__compensation = 0.0
+        self.__updates = 0
+
+    def __tolerance(self, mean_price):
+        # far above the rounding difference between the running sum and np.mean over one window
+        return 4 * self.__window * np.spacing(np.abs(mean_price))
+
+    def __near_boundary(self, price, mean_price) -> bool:
+        tolerance = self.__tolerance(mean_price)
+        return (abs(price - mean_price * (1 - self.__threshold)) <= tolerance
+                or abs(price - mean_price * (1 + self.__threshold)) <= tolerance)
 
     def generate_signals(self, tick: MarketDataPoint) -> dict:
 
         if tick == []:
             return 0
 
+        if len(self.__prices) == self.__window:
+            self.__add(-self.__prices[0])
         self.__prices.append(tick.price)
+        self.__add(tick.price)
+
+        # amortized O(1) : one O(window) exact resum every `window` ticks
+        self.__updates += 1
+        if self.__updates >= self.__window:
+            self.__resync()
+
         signal = 0
 
         if len(self.__prices) < self.__window:
             return 0
 
-        mean_price = np.mean(self.__prices)
+        mean_price = self.__sum / self.__window
+        if self.__near_boundary(tick.price, mean_price):
+            # the running sum may round differently from np.mean : decide ties with the exact same mean
+            mean_price = np.mean(self.__prices)
 
         if tick.price < mean_price * (1 - self.__threshold):
             signal = 1
@@ -51,12 +155,54 @@ class MeanReversionStrategy(Strategy):
             self.publisher.notify(signal_data)
             return signal_data
 
+    def run_batch(self, prices, symbol: str) -> list:
+        """
+        vectorized generate_signals over a price array of one symbol
+        emits the same signals and notifications, and leaves the strategy in the same state as tick-by-tick processing
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        # continue from the buffered prices so batches and single ticks can be mixed
+        buffered = len(self.__prices)
+        history = np.concatenate([np.fromiter(self.__prices, dtype=np.float64, count=buffered), prices])
+
+        signals = []
+        if len(history) >= self.__window:
+            # means[k] is the mean of the window ending at tick k + window - 1 (current tick included)
+            windows = sliding_window_view(history, self.__window)
+            means = windows.mean(axis=1)
+            current = history[self.__window - 1:]
+            # same tie rule as generate_signals : next to a threshold the decision uses np.mean of the window
+            tolerance = self.__tolerance(means)
+            near = ((np.abs(current - means * (1 - self.__threshold)) <= tolerance)
+                    | (np.abs(current - means * (1 + self.__threshold)) <= tolerance))
+            for k in np.flatnonzero(near):
+                means[k] = np.mean(windows[k])
+            side = np.where(current < means * (1 - self.__threshold), 1,
+                            np.where(current > means * (1 + self.__threshold), -1, 0))
+            # windows ending on an already buffered tick were emitted by earlier calls
+            side[:max(0, buffered - self.__window + 1)] = 0
+
+            for k in np.flatnonzero(side):
+                signal_data = {'strategy': "MeanReversionStrategy",
+                               'symbol': symbol,
+                               'signal': int(side[k]),
+                               'price': float(current[k]),
+                               'qty': 2,
+                               }
+                self.publisher.notify(signal_data)
+                signals.append(signal_data)
+
+        self.__prices.extend(prices[-self.__window:].tolist())
+        self.__resync()
+        return signals
+
 class BreakoutStrategy(Strategy):
     def __init__(self, params, publisher):
         super().__init__(params, publisher)
         self.__threshold = params["threshold"]
         self.__window = params["lookback_window"]
         self.__prices = deque(maxlen=self.__window)
+        self.__extrema = RollingExtrema(self.__window)
 
     def generate_signals(self, tick: MarketDataPoint) -> dict:
 
@@ -65,10 +211,11 @@ class BreakoutStrategy(Strategy):
 
         if len(self.__prices) < self.__window:
             self.__prices.append(tick.price)
+            self.__extrema.push(tick.price)
             return 0
 
-        high = np.max(self.__prices)
-        low = np.min(self.__prices)
+        high = self.__extrema.max()
+        low = self.__extrema.min()
 
         signal = 0
         if tick.price > high * (1 + self.__threshold):
@@ -77,6 +224,7 @@ class BreakoutStrategy(Strategy):
             signal = -1
 
         self.__prices.append(tick.price)
+        self.__extrema.push(tick.price)
 
         if signal != 0:
             signal_data = {'strategy': "BreakoutStrategy",
@@ -87,3 +235,36 @@ class BreakoutStrategy(Strategy):
                            }
             self.publisher.notify(signal_data)
             return signal_data
+
+    def run_batch(self, prices, symbol: str) -> list:
+        """
+        vectorized generate_signals over a price array of one symbol
+        emits the same signals and notifications, and leaves the strategy in the same state as tick-by-tick processing
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        # continue from the buffered prices so batches and single ticks can be mixed
+        history = np.concatenate([np.fromiter(self.__prices, dtype=np.float64, count=len(self.__prices)), prices])
+
+        signals = []
+        if len(history) > self.__window:
+            # high[k], low[k] cover the window right before tick k + window
+            high, low = rolling_extrema(history[:-1], self.__window)
+            current = history[self.__window:]
+            side = np.where(current > high * (1 + self.__threshold), 1,
+                            np.where(current < low * (1 - self.__threshold), -1, 0))
+
+            for k in np.flatnonzero(side):
+                signal_data = {'strategy': "BreakoutStrategy",
+                               'symbol': symbol,
+                               'signal': int(side[k]),
+                               'price': float(current[k]),
+                               'qty': 2,
+                               }
+                self.publisher.notify(signal_data)
+                signals.append(signal_data)
+
+        self.__prices.extend(prices[-self.__window:].tolist())
+        self.__extrema = RollingExtrema(self.__window)
+        for price in self.__prices:
+            self.__extrema.push(price)
+        return signals
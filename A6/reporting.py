@@ -3,6 +3,10 @@ from patterns.observers import Observer
 from datetime import datetime
 import json
 import csv
+import logging
+
+signal_log = logging.getLogger("a6.report.signals")
+report_log = logging.getLogger("a6.report")
 
 
 class reportObserver(Observer):
@@ -33,7 +37,8 @@ class reportObserver(Observer):
 
         self.historic['average price'] += (signal['price'] - self.historic['average price'])/self.historic['Total signals']
 
-        print(f"[REPORT] ADDED {signal['signal']} signal for {signal['symbol']} at {signal['price']} with {signal['strategy']}")
+        signal_log.info("[REPORT] ADDED %s signal for %s at %s with %s",
+                        signal['signal'], signal['symbol'], signal['price'], signal['strategy'])
 
     def summary(self) -> dict:
         summary = self.historic.copy()
@@ -43,14 +48,14 @@ class reportObserver(Observer):
     def to_json(self, filename = "report.json"):
         with open(filename, "w") as f:
             json.dump(self.signals, f)
-        print(f"[REPORT] Wrote JSON to {filename}")
+        report_log.info("[REPORT] Wrote JSON to %s", filename)
 
     def to_csv(self, filename = "report.csv"):
         with open(filename, "w", newline="") as f:
             writer = csv.DictWriter(f, fieldnames=self.signals[0].keys())
             writer.writeheader()
             writer.writerows(self.signals)
-        print(f"[REPORT] Wrote CSV to {filename}")
+        report_log.info("[REPORT] Wrote CSV to %s", filename)
 
 
 
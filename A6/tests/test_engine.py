@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+from engine import ExecutionEngine
+from models import MarketDataPoint, TickBatch
+from patterns.strategies import BreakoutStrategy, MeanReversionStrategy
+from patterns.observers import SignalPublisher
+
+
+def _market_data():
+    start = datetime(2025, 10, 25, 9, 30)
+    prices = {"AAPL": [100, 101, 99, 104, 110, 95, 102, 120, 90, 100],
+              "MSFT": [300, 310, 290, 305, 330, 280, 300, 350, 260, 300]}
+    ticks = []
+    for i in range(10):
+        for symbol, series in prices.items():
+            ticks.append(MarketDataPoint(start + timedelta(seconds=i), symbol, float(series[i])))
+    return ticks
+
+
+def _strategies():
+    params = {"lookback_window": 3, "threshold": 0.02}
+    return {"BreakoutStrategy": BreakoutStrategy(params, SignalPublisher()),
+            "MeanReversionStrategy": MeanReversionStrategy(params, SignalPublisher())}
+
+
+def test_engine_accepts_tick_batch():
+    market_data = _market_data()
+    list_engine = ExecutionEngine(market_data, _strategies())
+    batch_engine = ExecutionEngine(TickBatch.from_points(market_data), _strategies())
+
+    for symbol in ["AAPL", "MSFT"]:
+        expected = list_engine.generate_all_signals(symbol)
+        assert batch_engine.generate_all_signals(symbol) == expected
+        assert any(expected.values())
+
+
+def test_symbol_index_partitions_market_data():
+    market_data = _market_data()
+    engine = ExecutionEngine(market_data, _strategies())
+
+    assert set(engine.symbol_index) == {"AAPL", "MSFT"}
+    assert [market_data[i].symbol for i in engine.symbol_index["AAPL"]] == ["AAPL"] * 10
+    assert list(ExecutionEngine(TickBatch.from_points(market_data), _strategies()).symbol_index["MSFT"]) \
+        == engine.symbol_index["MSFT"]
+
+
+def test_generate_all_signals_for_matches_per_symbol_calls():
+    market_data = _market_data()
+    engine = ExecutionEngine(market_data, _strategies())
+    expected = {symbol: engine.generate_all_signals(symbol) for symbol in ["AAPL", "MSFT"]}
+
+    assert ExecutionEngine(market_data, _strategies()).generate_all_signals_for(["AAPL", "MSFT"]) == expected
+    assert ExecutionEngine(TickBatch.from_points(market_data), _strategies()).generate_all_signals_for() == expected
+    assert ExecutionEngine(market_data, _strategies()).generate_all_signals_for(["GOOG"]) \
+        == {"GOOG": {"BreakoutStrategy": [], "MeanReversionStrategy": []}}
+
+
+def test_apply_signals_keeps_portfolio_shape_and_index():
+    engine = ExecutionEngine(_market_data(), _strategies())
+    signals = [{"strategy": "BreakoutStrategy", "symbol": "AAPL", "signal": 1, "price": 100.0, "qty": 2},
+               {"strategy": "BreakoutStrategy", "symbol": "MSFT", "signal": 1, "price": 300.0, "qty": 2},
+               {"strategy": "BreakoutStrategy", "symbol": "AAPL", "signal": -1, "price": 110.0, "qty": 2}]
+
+    engine.apply_signals_to_portfolio("BreakoutStrategy", signals)
+    portfolio = engine.portfolio["BreakoutStrategy"]
+
+    assert set(portfolio) == {"name", "owner", "positions", "sub_portfolios"}
+    assert portfolio["positions"] == [{"symbol": "AAPL", "quantity": 4, "price": 105.0},
+                                      {"symbol": "MSFT", "quantity": 2, "price": 300.0}]
+    assert engine.position_index["BreakoutStrategy"]["AAPL"] is portfolio["positions"][0]
+
+
+def test_apply_signals_bulk_matches_per_signal_path():
+    engine = ExecutionEngine(_market_data(), _strategies())
+    bulk_engine = ExecutionEngine(_market_data(), _strategies())
+
+    for symbol, all_signals in engine.generate_all_signals_for(["AAPL", "MSFT"]).items():
+        for strategy_name, signals in all_signals.items():
+            engine.apply_signals_to_portfolio(strategy_name, signals)
+    for symbol, all_signals in bulk_engine.generate_all_signals_for(["AAPL", "MSFT"]).items():
+        for strategy_name, signals in all_signals.items():
+            bulk_engine.apply_signals_bulk(strategy_name, signals)
+
+    for strategy_name in engine.portfolio:
+        expected = engine.portfolio[strategy_name]["positions"]
+        positions = bulk_engine.portfolio[strategy_name]["positions"]
+        assert [(p["symbol"], p["quantity"]) for p in positions] == [(p["symbol"], p["quantity"]) for p in expected]
+        for p, e in zip(positions, expected):
+            assert abs(p["price"] - e["price"]) < 1e-3
+
+
+def test_run_parallel_matches_fresh_serial_runs():
+    market_data = _market_data()
+    engine = ExecutionEngine(market_data, _strategies())
+    all_signals = engine.run_parallel(["AAPL", "MSFT"], max_workers=2)
+
+    serial = ExecutionEngine(market_data, _strategies())
+    for symbol in ["AAPL", "MSFT"]:
+        # the parallel path starts every symbol from fresh strategy state
+        expected = ExecutionEngine(market_data, _strategies()).generate_all_signals(symbol)
+        assert all_signals[symbol] == expected
+        for strategy_name, signals in expected.items():
+            serial.apply_signals_to_portfolio(strategy_name, signals)
+
+    assert engine.portfolio == serial.portfolio
@@ -0,0 +1,67 @@
+import io
+import logging
+from log_config import setup_logging, shutdown_logging, SampleFilter
+from patterns.observers import SignalPublisher, LoggerObserver, AlertObserver
+from reporting import reportObserver
+from patterns.commands import Broker
+
+
+def _signal(qty=1):
+    return {"strategy": "BreakoutStrategy", "symbol": "MSFT", "signal": 1, "price": 150, "qty": qty}
+
+
+def test_sample_filter_keeps_one_in_every():
+    sample = SampleFilter(every=3)
+    info = logging.LogRecord("a6.signals", logging.INFO, __file__, 1, "msg", None, None)
+    warning = logging.LogRecord("a6.signals", logging.WARNING, __file__, 1, "msg", None, None)
+
+    assert [sample.filter(info) for _ in range(7)] == [True, False, False, True, False, False, True]
+    assert sample.filter(warning)
+
+
+def test_observers_and_broker_log_through_listener():
+    stream = io.StringIO()
+    setup_logging(level="INFO", sample_every=2, stream=stream)
+    try:
+        observer = LoggerObserver()
+        for _ in range(4):
+            observer.update(_signal())
+        AlertObserver().update(_signal(qty=5))
+        Broker().execute_order(1, "MSFT", 5, 150)
+    finally:
+        shutdown_logging()
+
+    lines = stream.getvalue().splitlines()
+    # 4 signals sampled one in two, the alert and the broker trade are never sampled
+    assert sum("[LOGGER] BreakoutStrategy emits signal 1 at 150 on MSFT" in line for line in lines) == 2
+    assert any("WARNING a6.alerts [ALERT] LARGE TRADE" in line for line in lines)
+    assert any("a6.broker [BROKER] EXECUTED BUY signal for 5 MSFT at 150" in line for line in lines)
+
+
+def test_observers_on_one_publisher_are_sampled_independently():
+    stream = io.StringIO()
+    setup_logging(level="INFO", sample_every=2, stream=stream)
+    try:
+        publisher = SignalPublisher()
+        publisher.attach(LoggerObserver())
+        publisher.attach(reportObserver())
+        for _ in range(10):
+            publisher.notify(_signal())
+    finally:
+        shutdown_logging()
+
+    output = stream.getvalue()
+    assert output.count("[LOGGER]") == 5
+    assert output.count("[REPORT] ADDED") == 5
+
+
+def test_level_from_argument_filters_before_formatting():
+    stream = io.StringIO()
+    setup_logging(level="WARNING", sample_every=1, stream=stream)
+    try:
+        LoggerObserver().update(_signal())
+        Broker().reverse_order(1, "MSFT", 5, 150)
+    finally:
+        shutdown_logging()
+
+    assert stream.getvalue() == ""
@@ -3,7 +3,10 @@ import xml.etree.ElementTree as ET
 import pytest
 import json
 from datetime import datetime
-from models import MarketDataPoint, PortfolioGroup, Position
+from unittest.mock import MagicMock
+from data_loader import CSVAdapter
+from models import MarketDataPoint, PortfolioGroup, Position, TickBatch
+from tick_cache import cache_paths
 
 
 def _create_test_xml(file_path, entries):
@@ -130,3 +133,40 @@ def test_portfolio_group():
     assert group.get_value() == pos1.get_value() + pos2.get_value()
     assert group.get_position() == pos1.get_position() + pos2.get_position()
 
+
+def test_tick_batch_round_trip():
+    points = [
+        MarketDataPoint(datetime(2025, 10, 25, 12, 0, 0), "MSFT", 325.0),
+        MarketDataPoint(datetime(2025, 10, 25, 12, 0, 1), "AAPL", 185.23),
+        MarketDataPoint(datetime(2025, 10, 25, 12, 0, 2), "MSFT", 326.5),
+    ]
+    batch = TickBatch.from_points(points)
+
+    assert len(batch) == 3
+    assert batch.timestamps.dtype.name == "int64"
+    assert batch.symbol_ids.dtype.name == "int32"
+    assert batch.prices.dtype.name == "float64"
+    assert batch.to_points() == points
+    assert batch[1] == points[1]
+    assert batch.select("MSFT").to_points() == [points[0], points[2]]
+    assert len(batch.select("GOOG")) == 0
+
+
+def test_market_data_cache_round_trip_and_invalidation(tmp_path):
+    adapter = CSVAdapter()
+    adapter.get_directory_path = MagicMock(return_value=str(tmp_path))
+    csv_path = os.path.join(str(tmp_path), "market_data.csv")
+    with open(csv_path, "w") as f:
+        f.write("timestamp,symbol,price\n2025-10-25 12:00:00,AAPL,185.23\n2025-10-25 12:00:01,MSFT,325.0\n")
+
+    expected = adapter.get_market_data()
+    assert adapter.get_market_data(use_cache=True) == expected
+    assert all(os.path.exists(p) for p in cache_paths(csv_path))
+    # second call is served from the memory-mapped cache
+    assert adapter.get_market_data(use_cache=True, as_batch=True).to_points() == expected
+
+    # rewriting the csv changes its size, so the cache is rebuilt
+    with open(csv_path, "a") as f:
+        f.write("2025-10-25 12:00:02,AAPL,186.0\n")
+    assert adapter.get_market_data(use_cache=True) == adapter.get_market_data()
+    assert len(adapter.get_market_data(use_cache=True)) == 3
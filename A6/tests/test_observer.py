@@ -1,5 +1,7 @@
 from patterns.observers import SignalPublisher, LoggerObserver, AlertObserver
 import pytest
+import threading
+import time
 
 def test_notify_observers():
     signal = {"strategy": "BreakoutStrategy",
@@ -46,4 +48,98 @@ def test_attaching_observers():
     publisher.notify(signal)
 
     assert len(obs1) == 1
-    assert len(obs2) == 2
\ No newline at end of file
+    assert len(obs2) == 2
+
+def _signal(i, symbol="MSFT"):
+    return {"strategy": "BreakoutStrategy", "symbol": symbol, "signal": 1, "price": 150 + i, "qty": 1}
+
+
+def test_batched_publisher_delivers_in_order():
+    batches = []
+
+    class obs:
+        def update_batch(self, signals):
+            batches.append(list(signals))
+
+    with SignalPublisher(batched=True, capacity=8, batch_size=4) as publisher:
+        publisher.attach(obs())
+        for i in range(50):
+            publisher.notify(_signal(i))
+        publisher.flush()
+        stats = publisher.stats()
+
+    delivered = [s["price"] for batch in batches for s in batch]
+    assert delivered == [150 + i for i in range(50)]
+    assert max(len(batch) for batch in batches) <= 4
+    assert stats["published"] == stats["delivered"] == 50
+    assert stats["observers"][0]["signals"] == 50
+    assert stats["observers"][0]["max_latency_s"] >= stats["observers"][0]["mean_latency_s"] >= 0
+
+
+def test_batched_publisher_backpressure_policies():
+    gate = threading.Event()
+    executed = []
+
+    class slow:
+        def update(self, signal):
+            gate.wait()
+            executed.append(signal)
+
+    # first signal is taken by the delivery thread and held by the observer, the buffer then fills up
+    publisher = SignalPublisher(batched=True, capacity=2, batch_size=1, policy="drop_oldest")
+    publisher.attach(slow())
+    publisher.notify(_signal(0))
+    while publisher.stats()["pending"]:
+        time.sleep(0.001)
+    for i in range(1, 6):
+        publisher.notify(_signal(i))
+    gate.set()
+    publisher.close()
+    assert [s["price"] for s in executed] == [150, 154, 155]
+    assert publisher.stats()["dropped"] == 3
+
+    gate.clear()
+    executed.clear()
+    publisher = SignalPublisher(batched=True, capacity=2, batch_size=1, policy="coalesce")
+    publisher.attach(slow())
+    publisher.notify(_signal(0, "AAPL"))
+    while publisher.stats()["pending"]:
+        time.sleep(0.001)
+    for i in range(1, 6):
+        publisher.notify(_signal(i, "MSFT" if i % 2 else "SPY"))
+    gate.set()
+    publisher.close()
+    assert [(s["symbol"], s["price"]) for s in executed] == [("AAPL", 150), ("MSFT", 155), ("SPY", 154)]
+    assert publisher.stats()["coalesced"] == 3
+
+    # below capacity nothing is coalesced : a BUY then a SELL on the same symbol are both delivered
+    received = []
+
+    class recorder:
+        def update(self, signal):
+            received.append(signal["signal"])
+
+    publisher = SignalPublisher(batched=True, capacity=1024, policy="coalesce")
+    publisher.attach(recorder())
+    publisher.notify(dict(_signal(0, "AAPL"), signal=1))
+    publisher.notify(dict(_signal(1, "AAPL"), signal=-1))
+    publisher.close()
+    assert received == [1, -1]
+    assert publisher.stats()["coalesced"] == 0
+
+    with pytest.raises(ValueError):
+        SignalPublisher(batched=True, policy="fifo")
+
+
+def test_batched_publisher_reports_observer_errors():
+    class failing:
+        def update(self, signal):
+            raise KeyError("qty")
+
+    publisher = SignalPublisher(batched=True)
+    publisher.attach(failing())
+    publisher.notify(_signal(0))
+    with pytest.raises(KeyError):
+        publisher.close()
+    with pytest.raises(RuntimeError):
+        publisher.notify(_signal(1))
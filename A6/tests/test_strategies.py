@@ -1,4 +1,5 @@
-from patterns.strategies import BreakoutStrategy, MeanReversionStrategy
+import numpy as np
+from patterns.strategies import BreakoutStrategy, MeanReversionStrategy, RollingExtrema, rolling_extrema
 from patterns.observers import SignalPublisher, LoggerObserver, AlertObserver
 from models import MarketDataPoint
 
@@ -179,4 +180,102 @@ def test_Breakout_Strategy_no_signal():
     market_data = MarketDataPoint("2025-10-25T12:00:00", "AAPL", 120.2)
     signal = strategy.generate_signals(market_data)
 
-    assert publisher.trades == []
\ No newline at end of file
+    assert publisher.trades == []
+
+def test_stream_yields_only_signals():
+    strategy_params = {
+                "lookback_window": 2,
+                "threshold": 0.02
+                }
+    prices = [100, 101, 120, 100, 100, 80, 100]
+    ticks = [MarketDataPoint("2025-10-25T12:00:00", "AAPL", p) for p in prices]
+
+    for strategy_cls in [BreakoutStrategy, MeanReversionStrategy]:
+        expected = [s for s in map(strategy_cls(strategy_params, SignalPublisher()).generate_signals, ticks) if s]
+        streamed = list(strategy_cls(strategy_params, SignalPublisher()).stream(iter(ticks)))
+
+        assert streamed == expected
+        assert len(streamed) > 0
+        assert all(isinstance(s, dict) for s in streamed)
+
+
+def test_rolling_extrema_matches_full_scan():
+    rng = np.random.default_rng(7)
+    values = rng.normal(100, 5, 500).round(1)
+    window = 37
+
+    extrema = RollingExtrema(window)
+    high, low = rolling_extrema(values, window)
+    for i, v in enumerate(values):
+        extrema.push(v)
+        if i >= window - 1:
+            assert extrema.max() == np.max(values[i - window + 1:i + 1]) == high[i - window + 1]
+            assert extrema.min() == np.min(values[i - window + 1:i + 1]) == low[i - window + 1]
+
+
+def test_breakout_run_batch_matches_generate_signals():
+    class mockPublisher():
+        def __init__(self):
+            self.trades = []
+
+        def notify(self, signal):
+            self.trades.append(signal)
+
+    strategy_params = {"lookback_window": 20, "threshold": 0.01}
+    prices = (100 + np.cumsum(np.random.default_rng(3).normal(0, 1, 400))).tolist()
+
+    tick_publisher, batch_publisher = mockPublisher(), mockPublisher()
+    tick_strategy = BreakoutStrategy(strategy_params, tick_publisher)
+    batch_strategy = BreakoutStrategy(strategy_params, batch_publisher)
+
+    expected = [s for s in (tick_strategy.generate_signals(MarketDataPoint("2025-10-25T12:00:00", "AAPL", p))
+                            for p in prices) if s]
+    # split in two batches plus a single tick to check the state carried over
+    signals = batch_strategy.run_batch(prices[:7], "AAPL") + batch_strategy.run_batch(prices[7:-1], "AAPL")
+    last = batch_strategy.generate_signals(MarketDataPoint("2025-10-25T12:00:00", "AAPL", prices[-1]))
+    if last:
+        signals.append(last)
+
+    assert len(expected) > 0
+    assert signals == expected
+    assert batch_publisher.trades == tick_publisher.trades
+
+
+def test_mean_reversion_running_mean_and_run_batch_match_full_mean():
+    class mockPublisher():
+        def __init__(self):
+            self.trades = []
+
+        def notify(self, signal):
+            self.trades.append(signal)
+
+    rng = np.random.default_rng(5)
+    cases = [
+        (20, 0.01, (100 + np.cumsum(rng.normal(0, 1, 400))).tolist()),
+        # prices on a 0.01 grid with threshold 0 : many ticks sit exactly on the window mean
+        (5, 0.0, np.round(100 + np.cumsum(rng.integers(-2, 3, 20000)) * 0.01, 2).tolist()),
+        (20, 0.0, np.round(100 + np.cumsum(rng.integers(-2, 3, 20000)) * 0.01, 2).tolist()),
+    ]
+    for window, threshold, prices in cases:
+        strategy_params = {"lookback_window": window, "threshold": threshold}
+
+        # reference : the full np.mean over the window on every tick
+        expected = []
+        for i in range(window - 1, len(prices)):
+            mean_price = np.mean(prices[i - window + 1:i + 1])
+            if prices[i] < mean_price * (1 - threshold):
+                expected.append(1)
+            elif prices[i] > mean_price * (1 + threshold):
+                expected.append(-1)
+
+        tick_publisher, batch_publisher = mockPublisher(), mockPublisher()
+        tick_strategy = MeanReversionStrategy(strategy_params, tick_publisher)
+        batch_strategy = MeanReversionStrategy(strategy_params, batch_publisher)
+
+        tick_signals = [s for s in (tick_strategy.generate_signals(MarketDataPoint("2025-10-25T12:00:00", "AAPL", p))
+                                    for p in prices) if s]
+        batch_signals = batch_strategy.run_batch(prices[:25], "AAPL") + batch_strategy.run_batch(prices[25:], "AAPL")
+
+        assert [s["signal"] for s in tick_signals] == expected
+        assert batch_signals == tick_signals
+        assert batch_publisher.trades == tick_publisher.trades
@@ -0,0 +1,180 @@
+import json
+import os
+import platform
+import statistics
+import threading
+import time
+from datetime import datetime
+import psutil
+
+MiB = 1024 * 1024
+
+
+def _counters(proc: psutil.Process) -> tuple:
+    cpu = proc.cpu_times()
+    ctx = proc.num_ctx_switches()
+    return cpu.user, cpu.system, ctx.voluntary, ctx.involuntary
+
+
+class _TreeMonitor:
+    """
+    background sampler of the whole process tree (this process and every descendant, e.g. pool workers)
+    tracks peak summed RSS/USS and the last cpu/context-switch counters of each child
+    """
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.root = psutil.Process()
+        # counters of children that already existed, so only their work during the run is counted
+        self.first = {}
+        for child in self.root.children(recursive=True):
+            try:
+                self.first[child.pid] = _counters(child)
+            except psutil.Error:
+                continue
+        self.last = {}
+        self.peak_rss = 0
+        self.peak_uss = 0
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def sample(self):
+        rss = uss = 0
+        for proc in [self.root] + self.root.children(recursive=True):
+            try:
+                info = proc.memory_full_info()
+                if proc.pid != self.root.pid:
+                    self.last[proc.pid] = _counters(proc)
+            except psutil.Error:
+                # exited between listing and sampling
+                continue
+            rss += info.rss
+            uss += info.uss
+        self.peak_rss = max(self.peak_rss, rss)
+        self.peak_uss = max(self.peak_uss, uss)
+
+    def _run(self):
+        while not self._done.is_set():
+            self.sample()
+            self._done.wait(self.interval)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._done.set()
+        self._thread.join()
+        # one last sample so short runs still get counters
+        self.sample()
+
+    def live_children_delta(self, reaped: set) -> list:
+        # cpu/ctx spent by children still alive at the end (not yet in the parent's children_* times)
+        delta = [0.0, 0.0, 0, 0]
+        for pid, last in self.last.items():
+            if pid in reaped:
+                continue
+            first = self.first.get(pid, (0.0, 0.0, 0, 0))
+            for i in range(4):
+                delta[i] += last[i] - first[i]
+        return delta
+
+
+def _measure_once(func, args, kwargs, interval: float):
+    root = psutil.Process()
+    cpu_before, ctx_before = root.cpu_times(), root.num_ctx_switches()
+    baseline_rss = root.memory_info().rss
+    direct_children = {child.pid for child in root.children()}
+
+    monitor = _TreeMonitor(interval)
+    monitor.start()
+    start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        wall = time.perf_counter() - start
+        monitor.stop()
+    cpu_after, ctx_after = root.cpu_times(), root.num_ctx_switches()
+
+    alive = {child.pid for child in root.children(recursive=True)}
+    reaped = set(monitor.last) - alive
+    live_user, live_sys, live_vol, live_invol = monitor.live_children_delta(reaped)
+    # children_user/system add a reaped child's whole lifetime : drop what the direct children started before
+    # the run had already used by then
+    before = [first for pid, first in monitor.first.items() if pid in direct_children and pid not in alive]
+    before_user = sum(first[0] for first in before)
+    before_sys = sum(first[1] for first in before)
+
+    # own time + reaped children (children_user/system) + children still running
+    user = ((cpu_after.user - cpu_before.user) + (cpu_after.children_user - cpu_before.children_user - before_user)
+            + live_user)
+    system = ((cpu_after.system - cpu_before.system)
+              + (cpu_after.children_system - cpu_before.children_system - before_sys) + live_sys)
+    # reaped children's context switches are gone with them; count the last values sampled
+    reaped_vol = sum(monitor.last[pid][2] - monitor.first.get(pid, (0, 0, 0, 0))[2] for pid in reaped)
+    reaped_invol = sum(monitor.last[pid][3] - monitor.first.get(pid, (0, 0, 0, 0))[3] for pid in reaped)
+
+    run = {
+        "wall_s": wall,
+        "user_s": user,
+        "sys_s": system,
+        "cpu_percent": 100.0 * (user + system) / wall if wall > 0 else 0.0,
+        "baseline_rss_mib": baseline_rss / MiB,
+        "peak_rss_mib": monitor.peak_rss / MiB,
+        "peak_uss_mib": monitor.peak_uss / MiB,
+        "ctx_voluntary": (ctx_after.voluntary - ctx_before.voluntary) + live_vol + reaped_vol,
+        "ctx_involuntary": (ctx_after.involuntary - ctx_before.involuntary) + live_invol + reaped_invol,
+        "processes": 1 + len(monitor.last),
+    }
+    return result, run
+
+
+def run_benchmark(func, *args, name: str = None, warmup: int = 1, repeat: int = 5, interval: float = 0.05, **kwargs):
+    """
+    run func(*args, **kwargs) `warmup` times unmeasured, then `repeat` measured times while sampling the
+    whole process tree (children included) every `interval` seconds
+    returns (result of the last run, report dict) ; the report is JSON serializable, see write_report
+    """
+    for _ in range(warmup):
+        func(*args, **kwargs)
+
+    runs, result = [], None
+    for _ in range(repeat):
+        result, run = _measure_once(func, args, kwargs, interval)
+        runs.append(run)
+
+    summary = {}
+    for metric in runs[0] if runs else []:
+        values = [run[metric] for run in runs]
+        summary[metric] = {"min": min(values), "median": statistics.median(values),
+                           "mean": statistics.fmean(values), "max": max(values)}
+
+    report = {
+        "name": name or getattr(func, "__name__", "benchmark"),
+        "warmup": warmup,
+        "repeat": repeat,
+        "runs": runs,
+        "summary": summary,
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+    }
+    return result, report
+
+
+def write_report(reports: list, file_path: str):
+    with open(file_path, "w") as f:
+        json.dump(reports, f, indent=2)
+
+
+def compare_reports(baseline: dict, current: dict, metric: str = "wall_s", tolerance: float = 0.10) -> dict:
+    """
+    regression check on the median of `metric` : returns the ratio and whether current is slower than
+    baseline by more than `tolerance`
+    """
+    before = baseline["summary"][metric]["median"]
+    after = current["summary"][metric]["median"]
+    ratio = after / before if before else float("inf")
+    return {"name": current["name"], "metric": metric, "baseline": before, "current": after,
+            "ratio": ratio, "regression": ratio > 1 + tolerance}
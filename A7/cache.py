@@ -0,0 +1,163 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+import pandas as pd
+import polars as pl
+from data_loader import file_fingerprint, load_data_polars
+from metrics import rolling_metrics_pandas, rolling_metrics_polars
+
+MiB = 1024 * 1024
+
+
+def metrics_key(fingerprint: str, symbol: str, window: int, ts_cols, lib: str = "pandas") -> tuple:
+    # (source file hash, symbol, window, columns, frame library) : a changed file never hits an old entry
+    # fingerprint is file_fingerprint of the file taken when the frame was loaded, not when the key is built
+    return (fingerprint, symbol, int(window), tuple(ts_cols), lib)
+
+
+def _nbytes(df) -> int:
+    if isinstance(df, pl.DataFrame):
+        return int(df.estimated_size())
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class MetricsCache:
+    """
+    Two-tier cache of rolling-metric frames.
+    memory : LRU bounded by max_bytes (estimated frame sizes), least recently used entries evicted first ;
+             a frame larger than max_bytes is never held in memory, it is counted in stats["oversized"]
+    disk   : optional directory, polars frames as Arrow IPC (.arrow), pandas frames as Parquet (.parquet, index
+             kept) ; entries evicted from memory stay on disk and are promoted back on a hit
+    """
+    def __init__(self, max_bytes: int = 256 * MiB, directory: str = None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.nbytes = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "evicted_bytes": 0,
+                      "oversized": 0, "disk_writes": 0}
+
+    def __path(self, key, ext: str) -> str:
+        name = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.directory, name + ext)
+
+    def get(self, key):
+        if key in self.entries:
+            self.stats["memory_hits"] += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        df = self.__read(key)
+        if df is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["disk_hits"] += 1
+        self.__remember(key, df)
+        return df
+
+    def put(self, key, df):
+        self.__write(key, df)
+        self.__remember(key, df)
+
+    def __remember(self, key, df):
+        size = _nbytes(df)
+        if key in self.entries:
+            self.nbytes -= self.sizes.pop(key)
+            del self.entries[key]
+        # larger than the whole budget : disk only (nowhere without a directory)
+        if size > self.max_bytes:
+            self.stats["oversized"] += 1
+            return
+        self.entries[key] = df
+        self.sizes[key] = size
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            old, _ = self.entries.popitem(last=False)
+            evicted = self.sizes.pop(old)
+            self.nbytes -= evicted
+            self.stats["evictions"] += 1
+            self.stats["evicted_bytes"] += evicted
+
+    def __read(self, key):
+        if self.directory is None:
+            return None
+        path = self.__path(key, ".arrow")
+        if os.path.exists(path):
+            return pl.read_ipc(path)
+        path = self.__path(key, ".parquet")
+        if os.path.exists(path):
+            return pd.read_parquet(path)
+        return None
+
+    def __write(self, key, df):
+        if self.directory is None:
+            return
+        if isinstance(df, pl.DataFrame):
+            path = self.__path(key, ".arrow")
+            write = df.write_ipc
+        else:
+            path = self.__path(key, ".parquet")
+            write = df.to_parquet
+        # write then rename, so a reader never sees a half written file
+        tmp = f"{path}.{os.getpid()}.tmp"
+        write(tmp)
+        os.replace(tmp, path)
+        self.stats["disk_writes"] += 1
+
+    def cache_info(self) -> dict:
+        lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        disk_files = 0
+        if self.directory is not None:
+            disk_files = sum(name.endswith((".arrow", ".parquet")) for name in os.listdir(self.directory))
+        return {**self.stats, "hit_rate": hits / lookups if lookups else 0.0, "entries": len(self.entries),
+                "bytes": self.nbytes, "max_bytes": self.max_bytes, "disk_files": disk_files}
+
+    def clear(self, disk: bool = False):
+        self.entries.clear()
+        self.sizes.clear()
+        self.nbytes = 0
+        if disk and self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith((".arrow", ".parquet")):
+                    os.remove(os.path.join(self.directory, name))
+
+
+def cached_rolling_metrics(cache: MetricsCache, fingerprint: str, df, symbol: str, ts_cols: list, window: int = 20):
+    """
+    rolling_metrics_pandas / rolling_metrics_polars (picked from the type of df) through the cache
+    fingerprint : file_fingerprint of the file df was loaded from, taken at load time
+    returns (df_symbol, elapsed_time), elapsed_time being the lookup time on a hit
+    """
+    start = time.perf_counter()
+
+    lib = "polars" if isinstance(df, pl.DataFrame) else "pandas"
+    key = metrics_key(fingerprint, symbol, window, ts_cols, lib)
+    df_symbol = cache.get(key)
+    if df_symbol is None:
+        if lib == "polars":
+            df_symbol, _ = rolling_metrics_polars(df, symbol, ts_cols, window)
+        else:
+            df_symbol, _ = rolling_metrics_pandas(df, symbol, ts_cols, window)
+        cache.put(key, df_symbol)
+
+    end = time.perf_counter()
+    elapsed_time = end - start
+
+    return df_symbol, elapsed_time
+
+
+if __name__ == "__main__":
+    file_path = "./data/market_data-1.csv"
+    fingerprint = file_fingerprint(file_path)
+    df_polars, _, _ = load_data_polars(file_path)
+    cache = MetricsCache(max_bytes=64 * MiB, directory="./.metrics_cache")
+
+    for attempt in ("cold", "warm"):
+        _, elapsed_time = cached_rolling_metrics(cache, fingerprint, df_polars, "AAPL", ["price"], window=20)
+        print(f"AAPL window 20 ({attempt}) - Time: {elapsed_time * 1000:.2f}ms")
+    print(cache.cache_info())
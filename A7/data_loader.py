@@ -1,32 +1,151 @@
+import hashlib
+import os
+import sys
 import time
+import numpy as np
 import pandas as pd
 import polars as pl
 from memory_profiler import memory_usage
+from tick_cache import load_cached_ticks
+from benchmark import run_benchmark, write_report
 
-def load_data_pandas(file_path: str) -> pd.DataFrame:
+
+def _parse_ticks(file_path: str) -> tuple:
+    df = pd.read_csv(file_path, usecols=["timestamp", "symbol", "price"], dtype={"symbol": str, "price": "float64"})
+    symbol_ids, symbols = pd.factorize(df["symbol"], sort=True)
+    timestamps = pd.to_datetime(df["timestamp"]).to_numpy(dtype="datetime64[ns]").view(np.int64)
+    return timestamps, symbol_ids, df["price"].to_numpy(), symbols.tolist()
+
+
+# resolution read_csv(parse_dates=True) gives whole-second timestamps : "us" from pandas 3, "ns" before
+_CSV_UNIT = pd.to_datetime(pd.Series(["2000-01-01 00:00:00"])).dt.unit
+
+
+def _read_cached_pandas(file_path: str) -> pd.DataFrame:
+    timestamps, symbol_ids, prices, symbols = load_cached_ticks(file_path, _parse_ticks)
+    timestamps = np.asarray(timestamps)
+    index = pd.DatetimeIndex(timestamps.view("datetime64[ns]"), name="timestamp")
+    # same index dtype as the csv path, which only keeps nanoseconds for timestamps that need them
+    if not (timestamps % 1000).any():
+        index = index.as_unit(_CSV_UNIT)
+    return pd.DataFrame(
+        {"symbol": np.asarray(symbols, dtype=object)[symbol_ids], "price": np.asarray(prices)},
+        index=index,
+    )
+
+
+def _read_cached_polars(file_path: str) -> pl.DataFrame:
+    timestamps, symbol_ids, prices, symbols = load_cached_ticks(file_path, _parse_ticks)
+    return pl.DataFrame({
+        "timestamp": pl.Series(np.asarray(timestamps).view("datetime64[ns]")).cast(pl.Datetime("us")),
+        "symbol": pl.Series(symbols, dtype=pl.String).gather(np.asarray(symbol_ids)),
+        "price": np.asarray(prices),
+    })
+
+
+def _timed(read, file_path):
     start = time.perf_counter()
-    df = pd.read_csv(file_path, index_col='timestamp', parse_dates=True)
-    end = time.perf_counter()
+    df = read(file_path)
+    return df, time.perf_counter() - start
 
-    elapsed_time = end - start
-    mem = memory_usage((pd.read_csv, (file_path,)), max_usage=True)    
+
+def load_data_pandas(file_path: str, use_cache: bool = False) -> pd.DataFrame:
+    # use_cache : memory-map the binary tick cache (timestamp, symbol, price) instead of parsing the csv
+    read = _read_cached_pandas if use_cache else (lambda path: pd.read_csv(path, index_col='timestamp', parse_dates=True))
+
+    # the file is read once : time and peak memory are measured on the call that produces df
+    mem, (df, elapsed_time) = memory_usage((_timed, (read, file_path)), max_usage=True, retval=True)
     return df, elapsed_time, mem
 
-def load_data_polars(file_path: str) -> pl.DataFrame:
-    start = time.perf_counter()
-    df = (
-        pl.read_csv(file_path, has_header=True, try_parse_dates=True)
-          .sort("timestamp")
-          .with_columns(pl.col("timestamp").alias("_index"))
-    )
-    end = time.perf_counter()
+def load_data_polars(file_path: str, use_cache: bool = False) -> pl.DataFrame:
+    read_raw = _read_cached_polars if use_cache else (lambda path: pl.read_csv(path, has_header=True, try_parse_dates=True))
+
+    def read(path):
+        return (
+            read_raw(path)
+              .sort("timestamp")
+              .with_columns(pl.col("timestamp").alias("_index"))
+        )
 
-    elapsed_time = end - start
-    mem = memory_usage((pl.read_csv, (file_path,)), max_usage=True)
+    mem, (df, elapsed_time) = memory_usage((_timed, (read, file_path)), max_usage=True, retval=True)
 
     return df, elapsed_time, mem
 
+def scan_data_polars(file_path: str, symbols: list = None) -> pl.LazyFrame:
+    """
+    lazy counterpart of load_data_polars : nothing is read until collect(),
+    and the symbol filter is pushed down into the csv scan so other symbols' rows are never materialized
+    """
+    lf = pl.scan_csv(file_path, has_header=True, try_parse_dates=True)
+    if symbols is not None:
+        lf = lf.filter(pl.col("symbol").is_in(list(symbols)))
+    return lf.sort("timestamp").with_columns(pl.col("timestamp").alias("_index"))
+
+# (path, mtime_ns, size) -> digest, so an unchanged file is hashed only once per process
+_fingerprints = {}
+
+
+def file_fingerprint(file_path: str) -> str:
+    """
+    content hash (blake2b) of a data file, a cache key that changes whenever the file does
+    """
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    if key not in _fingerprints:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _fingerprints[key] = digest.hexdigest()
+    return _fingerprints[key]
+
+
+def _loaders() -> dict:
+    loaders = {
+        "pandas (C engine)": lambda path: pd.read_csv(path, engine="c", parse_dates=["timestamp"]),
+        "polars eager": lambda path: pl.read_csv(path, has_header=True, try_parse_dates=True),
+        "polars lazy": lambda path: pl.scan_csv(path, has_header=True, try_parse_dates=True).collect(),
+        "pandas (pyarrow engine)": lambda path: pd.read_csv(path, engine="pyarrow", parse_dates=["timestamp"]),
+        "binary cache": _read_cached_pandas,
+    }
+    return loaders
+
+
+def benchmark_loaders(file_paths: list, repeat: int = 3, report_path: str = None) -> pd.DataFrame:
+    """
+    loader throughput across file sizes : every loader reads each file once per run (the warmup run also
+    builds the binary cache), reported as median seconds, rows/s and MB/s plus peak RSS
+    """
+    rows, reports = [], []
+    for file_path in file_paths:
+        size_mb = os.path.getsize(file_path) / 1e6
+        for name, read in _loaders().items():
+            df, report = run_benchmark(read, file_path, name=f"{name} | {file_path}", warmup=1, repeat=repeat)
+            reports.append(report)
+            seconds = report["summary"]["wall_s"]["median"]
+            rows.append({
+                "file": os.path.basename(file_path),
+                "size_mb": size_mb,
+                "loader": name,
+                "rows": len(df),
+                "seconds": seconds,
+                "rows_per_s": len(df) / seconds,
+                "mb_per_s": size_mb / seconds,
+                "peak_rss_mib": report["summary"]["peak_rss_mib"]["max"],
+            })
+
+    if report_path is not None:
+        write_report(reports, report_path)
+    return pd.DataFrame(rows)
+
+
 if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        # python data_loader.py --benchmark file1.csv file2.csv ...
+        file_paths = [arg for arg in sys.argv[1:] if arg != "--benchmark"] or ["./data/market_data-1.csv"]
+        print(benchmark_loaders(file_paths, report_path="loader_benchmark.json").to_string(index=False))
+        sys.exit(0)
+
     pandas_df, pandas_time, pandas_mem = load_data_pandas("./data/market_data-1.csv")
     print("Pandas DataFrame:")
     print(pandas_df.head())
@@ -37,4 +156,4 @@ if __name__ == "__main__":
     print("\nPolars DataFrame:")
     print(polars_df.head())
     print(f"Elapsed Time: {polars_time:.4f} seconds")
-    print(f"Memory Usage: {polars_mem} MiB")
\ No newline at end of file
+    print(f"Memory Usage: {polars_mem} MiB")
@@ -0,0 +1,100 @@
+import asyncio
+import sys
+import time
+from data_loader import load_data_pandas, load_data_polars, file_fingerprint
+from parallel import MetricsWorkerPool
+from cache import MetricsCache, metrics_key
+
+
+class MetricsService:
+    """
+    asyncio front end for rolling-metrics requests (symbol, window, columns) on one data file.
+    The file is loaded once and published to a persistent process pool; concurrent identical requests share
+    one computation and finished frames are kept in a MetricsCache keyed by (file fingerprint, symbol, window, columns).
+    """
+    def __init__(self, file_path: str, lib: str = "polars", max_workers: int = None, cache: MetricsCache = None):
+        self.file_path = file_path
+        self.lib = lib
+        self.max_workers = max_workers
+        self.cache = cache if cache is not None else MetricsCache()
+        self.inflight = {}
+        self.deduplicated = 0
+        self.pool = None
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        load = load_data_polars if self.lib == "polars" else load_data_pandas
+        # loading, hashing and starting the workers block : keep them off the event loop
+        # the fingerprint keys every cached result, so it must describe the data actually loaded :
+        # taken once here, and the load is redone if the file changed while it was being read
+        while True:
+            fingerprint = await loop.run_in_executor(None, file_fingerprint, self.file_path)
+            df, _, _ = await loop.run_in_executor(None, load, self.file_path)
+            if await loop.run_in_executor(None, file_fingerprint, self.file_path) == fingerprint:
+                break
+        self.fingerprint = fingerprint
+        self.pool = await loop.run_in_executor(None, MetricsWorkerPool, df, self.lib, self.max_workers)
+        return self
+
+    async def rolling_metrics(self, symbol: str, window: int = 20, ts_cols: tuple = ("price",)):
+        # returns (df_symbol, elapsed_time) like rolling_metrics_pandas / rolling_metrics_polars
+        # elapsed_time is 0.0 for a cached frame
+        key = metrics_key(self.fingerprint, symbol, window, ts_cols, self.lib)
+        if key in self.inflight:
+            self.deduplicated += 1
+        else:
+            df_symbol = self.cache.get(key)
+            if df_symbol is not None:
+                return df_symbol, 0.0
+            self.inflight[key] = asyncio.ensure_future(self.__compute(key))
+        # shield : a caller that gives up does not cancel the computation the others are waiting on
+        return await asyncio.shield(self.inflight[key])
+
+    async def __compute(self, key):
+        _, symbol, window, ts_cols, _ = key
+        try:
+            # the CPU work runs in the pool's worker processes, the event loop only awaits it
+            batch_results, _ = await asyncio.wrap_future(self.pool.submit([symbol], ts_cols, window))
+        finally:
+            del self.inflight[key]
+
+        df_symbol, elapsed_time = batch_results[symbol]
+        self.cache.put(key, df_symbol)
+        return df_symbol, elapsed_time
+
+    def cache_info(self) -> dict:
+        return {**self.cache.cache_info(), "deduplicated": self.deduplicated, "inflight": len(self.inflight)}
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+
+async def main(file_path: str):
+    async with MetricsService(file_path) as service:
+        symbols = service.pool.symbols
+        # several analysts asking at once : duplicates are computed once, repeats come from the cache
+        requests = [(s, w) for w in (20, 100) for s in symbols] * 2
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(service.rolling_metrics(s, w) for s, w in requests))
+        print(f"{len(requests)} concurrent requests - Time: {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(service.rolling_metrics(s, w) for s, w in requests))
+        print(f"{len(requests)} repeated requests - Time: {time.perf_counter() - start:.4f}s")
+
+        for (symbol, window), (df_symbol, elapsed) in list(zip(requests, results))[:len(symbols)]:
+            print(f"{symbol} window {window} - rows: {len(df_symbol)}, compute: {elapsed:.3f}s")
+        print(service.cache_info())
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else "./data/market_data-1.csv"))
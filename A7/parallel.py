@@ -1,132 +1,276 @@
-import time
-import pandas as pd
-import numpy as np
-import polars as pl
-from data_loader import load_data_pandas, load_data_polars
-from metrics import rolling_metrics_pandas, rolling_metrics_polars
-# for parallel programing library
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
-# for measuring performance libraries
-import psutil
-import threading
-from memory_profiler import memory_usage
-
-
-def compute_metrics_threading(df, symbols, lib="pandas", window=20):
-    # variables : df = loaded df / symbols = list of sybmol which is unique in df / lib = string pandas or polars / window = integer
-    results = {}
-
-    # context manager for each symbol's thread  
-    with ThreadPoolExecutor(max_workers=len(symbols)) as executor:
-        futures = {}
-        # futures = {future obejct1 : 'AAPL', 
-        #            future object2 : 'MSFT',
-        #            future object3 : 'SPY' 
-        #            } : key is a future object
-        for s in symbols:
-            # load on multi-thread process for each symbol 
-            if lib == "pandas":
-                futures[executor.submit(rolling_metrics_pandas, df, s, ["price"], window)] = s
-            elif lib == "polars":
-                futures[executor.submit(rolling_metrics_polars, df, s, ["price"], window)] = s
-            else:
-                raise ValueError(f"only pandas and polars are valid library")
-        
-        # use only key in dictionary:futures as an iterator
-        # retrieve results from each thread
-        for f in as_completed(futures):
-            symbol = futures[f]
-            result_df, elapsed = f.result()
-            results[symbol] = (result_df, elapsed)
-    
-    return results
-
-
-def compute_metrics_multiprocessing(df, symbols, lib="pandas", window=20):
-    results = {}
-
-    with ProcessPoolExecutor(max_workers=len(symbols)) as executor:
-        futures = {}
-        for s in symbols:
-            if lib == "pandas":
-                futures[executor.submit(rolling_metrics_pandas, df, s, ["price"], window)] = s
-            elif lib == "polars":
-                futures[executor.submit(rolling_metrics_polars, df, s, ["price"], window)] = s
-            else:
-                raise ValueError(f"only pandas and polars are valid library")
-
-        for f in as_completed(futures):
-            symbol = futures[f]
-            result_df, elapsed = f.result()
-            results[symbol] = (result_df, elapsed)
-    
-    return results
-
-
-
-def measure_performance(func, *args, **kwargs):
-    process = psutil.Process() 
-
-    def wrapper():
-        start_time = time.perf_counter()
-        result = func(*args, **kwargs)
-        total_time = time.perf_counter() - start_time
-        return result, total_time
-
-    mem_usage, (result, total_time) = memory_usage(wrapper, max_usage=True, retval=True)
-    # set interval to capture cpu usage 
-    cpu_percent = process.cpu_percent(interval=0.1)  
-
-    return result, total_time, cpu_percent, mem_usage
-
-
-def measure_cpu_during(func, *args, **kwargs):
-    process = psutil.Process()
-    cpu_readings = []
-
-
-    def monitor():
-        while not done[0]:
-            cpu_readings.append(process.cpu_percent(interval=0.05))
-
-    done = [False]
-    # generate upper thread to check cpu_usage
-    monitor_thread = threading.Thread(target=monitor)
-    monitor_thread.start()
-
-    start_time = time.perf_counter()
-    result = func(*args, **kwargs)
-    total_time = time.perf_counter() - start_time
-
-    done[0] = True
-    monitor_thread.join()
-
-    avg_cpu = sum(cpu_readings)/len(cpu_readings)
-
-    return result, total_time, avg_cpu
-
-
-
-if __name__ == "__main__":
-    window = 1000
-    file_path = "./data/market_data-1.csv"
-
-    df_pandas, _, _ = load_data_pandas(file_path)
-    df_polars, _, _ = load_data_polars(file_path)
-    symbols = df_pandas['symbol'].unique().tolist()
-
-    # Threading (pandas)
-    threading_results, total_time, avg_cpu = measure_cpu_during(compute_metrics_threading, df_pandas, symbols, lib="pandas", window=window)
-    print(f"Threading (Pandas) - Time: {total_time:.2f}s, Avg CPU: {avg_cpu:.1f}%")
-
-    # Multiprocessing (pandas)
-    multiprocessing_results, total_time, avg_cpu = measure_cpu_during(compute_metrics_multiprocessing, df_pandas, symbols, lib="pandas", window=window)
-    print(f"Multiprocessing (Pandas) - Time: {total_time:.2f}s, Avg CPU: {avg_cpu:.1f}%")
-
-    # Threading (polars)
-    threading_results_polars, total_time, avg_cpu = measure_cpu_during(compute_metrics_threading, df_polars, symbols, lib="polars", window=window)
-    print(f"Threading (Polars) - Time: {total_time:.2f}s, Avg CPU: {avg_cpu:.1f}%")
-
-    # Multiprocessing (polars)
-    multiprocessing_results_polars, total_time, avg_cpu = measure_cpu_during(compute_metrics_multiprocessing, df_polars, symbols, lib="polars", window=window)
-    print(f"Multiprocessing (Polars) - Time: {total_time:.2f}s, Avg CPU: {avg_cpu:.1f}%")
+import heapq
+import os
+import time
+from contextlib import contextmanager
+import pandas as pd
+import numpy as np
+import polars as pl
+from data_loader import load_data_pandas, load_data_polars
+from metrics import rolling_metrics_pandas, rolling_metrics_polars
+from shared_frame import SharedFrame, attach_symbol
+# for parallel programing library
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import multiprocessing
+# for measuring performance libraries
+from benchmark import run_benchmark, write_report
+
+
+# environment variables read by polars / BLAS backends when a worker process starts
+THREAD_ENV_VARS = ("POLARS_MAX_THREADS", "OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def available_cores() -> int:
+    # cores this process may run on (respects taskset / cgroup affinity where the OS exposes it)
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _symbol_counts(df, symbols) -> dict:
+    if isinstance(df, pl.DataFrame):
+        counts = dict(df.group_by("symbol").len().iter_rows())
+    else:
+        counts = df["symbol"].value_counts().to_dict()
+    return {s: int(counts.get(s, 0)) for s in symbols}
+
+
+def balanced_batches(counts: dict, n_batches: int) -> list:
+    """
+    longest-processing-time scheduling : symbols sorted by row count (largest first), each one added to the
+    batch with the fewest rows so far ; returns at most n_batches non-empty lists of symbols
+    """
+    n_batches = max(1, min(n_batches, len(counts)))
+    batches = [[] for _ in range(n_batches)]
+    heap = [(0, i) for i in range(n_batches)]
+    for symbol in sorted(counts, key=lambda s: (-counts[s], s)):
+        rows, i = heapq.heappop(heap)
+        batches[i].append(symbol)
+        heapq.heappush(heap, (rows + counts[symbol], i))
+    return [batch for batch in batches if batch]
+
+
+@contextmanager
+def _thread_env(threads: int):
+    # spawned workers inherit os.environ when they start, so the limits hold for the whole pool lifetime
+    previous = {var: os.environ.get(var) for var in THREAD_ENV_VARS}
+    os.environ.update({var: str(threads) for var in THREAD_ENV_VARS})
+    try:
+        yield
+    finally:
+        for var, value in previous.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+def _rolling_metrics(df, symbol, ts_cols, window, lib):
+    if lib == "pandas":
+        return rolling_metrics_pandas(df, symbol, ts_cols, window)
+    return rolling_metrics_polars(df, symbol, ts_cols, window)
+
+
+def _rolling_metrics_batch(df, batch, ts_cols, window, lib):
+    start = time.perf_counter()
+    results = {s: _rolling_metrics(df, s, ts_cols, window, lib) for s in batch}
+    return results, time.perf_counter() - start
+
+
+def _timing(batch, counts, results, elapsed) -> dict:
+    return {"symbols": list(batch), "rows": sum(counts[s] for s in batch),
+            "elapsed": elapsed, "compute": sum(results[s][1] for s in batch)}
+
+
+def _report(batch, counts, results, elapsed, timings, writer):
+    # per finished batch : timing record and hand-off of each symbol's frame to the writer
+    if timings is not None:
+        timings.append(_timing(batch, counts, results, elapsed))
+    if writer is not None:
+        for symbol in batch:
+            writer.write(symbol, results[symbol][0])
+
+
+def compute_metrics_threading(df, symbols, lib="pandas", window=20, max_workers=None, timings=None, writer=None):
+    # variables : df = loaded df / symbols = list of sybmol which is unique in df / lib = string pandas or polars / window = integer
+    # timings : optional list, one dict per batch is appended (symbols, rows, elapsed wall time, summed compute time)
+    # writer : optional, writer.write(symbol, df) is called as each batch finishes (e.g. reporting.StreamingReportWriter)
+    results = {}
+    if lib not in ("pandas", "polars"):
+        raise ValueError(f"only pandas and polars are valid library")
+
+    cores = available_cores()
+    if lib == "polars":
+        # polars already runs every query on its own thread pool : only add threads for cores it leaves idle
+        cores = max(1, cores // pl.thread_pool_size())
+    workers = max(1, min(max_workers or cores, len(symbols)))
+
+    # one batch per thread, balanced by row count, instead of one thread per symbol
+    counts = _symbol_counts(df, symbols)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        # futures = {future object : ['AAPL', 'SPY'], ...} : key is a future object, value its batch of symbols
+        for batch in balanced_batches(counts, workers):
+            futures[executor.submit(_rolling_metrics_batch, df, batch, ["price"], window, lib)] = batch
+
+        # use only key in dictionary:futures as an iterator
+        # retrieve results from each thread
+        for f in as_completed(futures):
+            batch_results, elapsed = f.result()
+            results.update(batch_results)
+            _report(futures[f], counts, batch_results, elapsed, timings, writer)
+
+    return results
+
+
+def _rolling_metrics_shared(handle, symbol, ts_cols, window, lib):
+    # worker side : attach to the shared frame by name and only materialize this symbol's rows
+    return _rolling_metrics(attach_symbol(handle, symbol), symbol, ts_cols, window, lib)
+
+
+def _rolling_metrics_shared_batch(handle, batch, ts_cols, window, lib):
+    start = time.perf_counter()
+    results = {s: _rolling_metrics_shared(handle, s, ts_cols, window, lib) for s in batch}
+    return results, time.perf_counter() - start
+
+
+# set in every pool worker by _init_worker : the handle of the SharedFrame the pool was created with
+_worker_handle = None
+
+
+def _init_worker(handle):
+    # runs once per worker process : pandas/polars are already imported with this module
+    global _worker_handle
+    _worker_handle = handle
+
+
+def _ready():
+    return os.getpid()
+
+
+def _pool_batch(batch, ts_cols, window, lib):
+    return _rolling_metrics_shared_batch(_worker_handle, batch, ts_cols, window, lib)
+
+
+class MetricsWorkerPool:
+    """
+    Long-lived spawn process pool for repeated rolling-metric runs on one frame.
+    The frame is published once as a SharedFrame and every worker is started (libraries imported, handle
+    stored) when the pool is created, so each rolling_metrics call only pays for the compute.
+    """
+    def __init__(self, df, lib: str = None, max_workers: int = None):
+        self.lib = lib or ("polars" if isinstance(df, pl.DataFrame) else "pandas")
+        if self.lib not in ("pandas", "polars"):
+            raise ValueError(f"only pandas and polars are valid library")
+
+        self.frame = SharedFrame(df)
+        self.counts = {s: end - start for s, (start, end) in self.frame.handle["ranges"].items()}
+        self.symbols = list(self.counts)
+
+        # at most one process per core, the cores split evenly between the processes' internal thread pools
+        cores = available_cores()
+        self.workers = max(1, min(max_workers or cores, cores, len(self.symbols)))
+        self.executor = None
+        try:
+            # spawn, not fork : forking after polars has started its thread pool can deadlock the workers
+            with _thread_env(max(1, cores // self.workers)):
+                self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                    mp_context=multiprocessing.get_context("spawn"),
+                                                    initializer=_init_worker, initargs=(self.frame.handle,))
+                # one task per worker starts all of them now, while the thread limits are in the environment ;
+                # result() raises BrokenProcessPool here if a worker failed to start
+                for f in [self.executor.submit(_ready) for _ in range(self.workers)]:
+                    f.result()
+        except BaseException:
+            if self.executor is not None:
+                self.executor.shutdown(cancel_futures=True)
+            self.frame.close()
+            raise
+
+    def submit(self, symbols: list, ts_cols: tuple = ("price",), window: int = 20) -> Future:
+        # one task for a batch of symbols, the future resolves to ({symbol: (df, elapsed)}, batch elapsed)
+        return self.executor.submit(_pool_batch, list(symbols), list(ts_cols), window, self.lib)
+
+    def rolling_metrics(self, symbols: list = None, ts_cols: tuple = ("price",), window: int = 20,
+                        timings: list = None, writer=None) -> dict:
+        symbols = self.symbols if symbols is None else symbols
+        counts = {s: self.counts.get(s, 0) for s in symbols}
+        futures = {self.submit(batch, ts_cols, window): batch for batch in balanced_batches(counts, self.workers)}
+
+        results = {}
+        for f in as_completed(futures):
+            batch_results, elapsed = f.result()
+            results.update(batch_results)
+            _report(futures[f], counts, batch_results, elapsed, timings, writer)
+        return results
+
+    def close(self):
+        self.executor.shutdown()
+        self.frame.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def compute_metrics_multiprocessing(df, symbols, lib="pandas", window=20, max_workers=None, timings=None, writer=None):
+    if lib not in ("pandas", "polars"):
+        raise ValueError(f"only pandas and polars are valid library")
+
+    # publish df once in shared memory instead of pickling the whole frame for every symbol
+    # one-shot pool : keep a MetricsWorkerPool around instead to reuse the workers across runs
+    with MetricsWorkerPool(df, lib, max_workers) as pool:
+        return pool.rolling_metrics(symbols, ["price"], window, timings, writer)
+
+
+
+def measure_performance(func, *args, **kwargs):
+    # one measured run over the whole process tree (pool workers included), CPU sampled during the run
+    result, report = run_benchmark(func, *args, warmup=0, repeat=1, **kwargs)
+    run = report["runs"][0]
+    return result, run["wall_s"], run["cpu_percent"], run["peak_rss_mib"]
+
+
+def measure_cpu_during(func, *args, **kwargs):
+    result, report = run_benchmark(func, *args, warmup=0, repeat=1, **kwargs)
+    run = report["runs"][0]
+    return result, run["wall_s"], run["cpu_percent"]
+
+
+
+if __name__ == "__main__":
+    window = 1000
+    file_path = "./data/market_data-1.csv"
+
+    df_pandas, _, _ = load_data_pandas(file_path)
+    df_polars, _, _ = load_data_polars(file_path)
+    symbols = df_pandas['symbol'].unique().tolist()
+
+    reports = []
+    for name, func, df, lib in [
+        ("Threading (Pandas)", compute_metrics_threading, df_pandas, "pandas"),
+        ("Multiprocessing (Pandas)", compute_metrics_multiprocessing, df_pandas, "pandas"),
+        ("Threading (Polars)", compute_metrics_threading, df_polars, "polars"),
+        ("Multiprocessing (Polars)", compute_metrics_multiprocessing, df_polars, "polars"),
+    ]:
+        _, report = run_benchmark(func, df, symbols, name=name, warmup=1, repeat=3, lib=lib, window=window)
+        reports.append(report)
+        summary = report["summary"]
+        print(f"{name} - Time: {summary['wall_s']['median']:.2f}s, "
+              f"Avg CPU: {summary['cpu_percent']['median']:.1f}%, "
+              f"Peak RSS: {summary['peak_rss_mib']['max']:.1f} MiB")
+
+        timings = []
+        func(df, symbols, lib=lib, window=window, timings=timings)
+        for t in timings:
+            print(f"    batch {t['symbols']} - rows: {t['rows']}, wall: {t['elapsed']:.3f}s, compute: {t['compute']:.3f}s")
+
+    # persistent pool : workers start once, later runs with new windows only pay for the compute
+    with MetricsWorkerPool(df_polars) as pool:
+        for w in (20, 100, window):
+            start = time.perf_counter()
+            pool.rolling_metrics(symbols, ["price"], w)
+            print(f"Worker pool (Polars) window {w} - Time: {time.perf_counter() - start:.2f}s")
+
+    write_report(reports, "benchmark_results.json")
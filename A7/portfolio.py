@@ -0,0 +1,147 @@
+import time
+import numpy as np
+import pandas as pd
+import polars as pl
+
+
+def _symbol_returns(df, col: str) -> tuple:
+    # (timestamps as int64 ns, returns) of one symbol frame from rolling_metrics_pandas / rolling_metrics_polars
+    if isinstance(df, pl.DataFrame):
+        timestamps = df["timestamp"].cast(pl.Datetime("ns")).to_numpy().view(np.int64)
+        rets = df[f"{col}_rets"] if f"{col}_rets" in df.columns else df[col].pct_change()
+        return timestamps, rets.to_numpy().astype(np.float64)
+
+    if "timestamp" in df.columns:
+        df = df.set_index("timestamp")
+    timestamps = pd.DatetimeIndex(df.index).as_unit("ns").asi8
+    rets = df[f"{col}_rets"] if f"{col}_rets" in df.columns else df[col].pct_change()
+    return timestamps, rets.to_numpy(dtype=np.float64)
+
+
+def returns_matrix(results: dict, col: str = "price") -> tuple:
+    """
+    symbols x time matrix of returns from compute_metrics_* results ({symbol: (df, elapsed)})
+    rows follow the sorted symbols, columns the union of all timestamps ; a symbol without a tick at a
+    timestamp (and its first tick) gets a 0 return
+    returns (symbols, timestamps as datetime64[ns], matrix)
+    """
+    symbols = sorted(results)
+    series = [_symbol_returns(results[s][0], col) for s in symbols]
+
+    timestamps = np.unique(np.concatenate([ts for ts, _ in series])) if series else np.empty(0, np.int64)
+    matrix = np.zeros((len(symbols), len(timestamps)))
+    for row, (ts, rets) in zip(matrix, series):
+        row[np.searchsorted(timestamps, ts)] = rets
+    np.nan_to_num(matrix, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+
+    return symbols, timestamps.view("datetime64[ns]"), matrix
+
+
+def weights_from_structure(structure: dict) -> dict:
+    """
+    market value weights (quantity * price, summing to 1) of every position in a portfolio structure
+    ({"positions": [...], "sub_portfolios": [...]}, see data/portfolio_structure-1.json), nested levels included
+    """
+    values = {}
+    stack = [structure]
+    while stack:
+        node = stack.pop()
+        for position in node.get("positions", []):
+            values[position["symbol"]] = values.get(position["symbol"], 0.0) + position["quantity"] * position["price"]
+        stack.extend(node.get("sub_portfolios", []))
+
+    total = sum(values.values())
+    return {symbol: value / total for symbol, value in values.items()}
+
+
+class PortfolioAnalytics:
+    """
+    Portfolio level analytics over the per-symbol frames of compute_metrics_* and a weights vector.
+    Everything is computed on one symbols x time returns matrix (NumPy) and polars rolling windows, with
+    the same conventions as metrics.py : sample std (ddof=1), Sharpe annualized by sqrt(252).
+    weights : {symbol: weight} (missing symbols weigh 0) or a sequence aligned with the sorted symbols
+    """
+    def __init__(self, results: dict, weights, col: str = "price"):
+        self.symbols, self.timestamps, self.returns = returns_matrix(results, col)
+        if isinstance(weights, dict):
+            self.weights = np.array([weights.get(s, 0.0) for s in self.symbols], dtype=np.float64)
+        else:
+            self.weights = np.asarray(weights, dtype=np.float64)
+        if self.weights.shape != (len(self.symbols),):
+            raise ValueError(f"expected {len(self.symbols)} weights, got {self.weights.shape}")
+
+    def portfolio_returns(self) -> np.ndarray:
+        return self.weights @ self.returns
+
+    def rolling_metrics(self, window: int = 20) -> tuple[pl.DataFrame, float]:
+        # portfolio returns with their rolling mean, volatility and annualized Sharpe
+        start = time.perf_counter()
+
+        rets = pl.Series("portfolio_rets", self.portfolio_returns())
+        rets_mean = rets.rolling_mean(window_size=window)
+        rets_std = rets.rolling_std(window_size=window, ddof=1)
+        df_portfolio = pl.DataFrame({
+            "timestamp": self.timestamps,
+            "portfolio_rets": rets,
+            f"portfolio_rets_mean_{window}": rets_mean,
+            f"portfolio_vol_{window}": rets_std,
+            f"portfolio_sharpe_{window}": rets_mean / rets_std * np.sqrt(252),
+        })
+
+        end = time.perf_counter()
+        elapsed_time = end - start
+
+        return df_portfolio, elapsed_time
+
+    def covariance(self) -> np.ndarray:
+        # always symbols x symbols, np.cov returns a 0-d array for a single symbol
+        return np.atleast_2d(np.cov(self.returns, ddof=1))
+
+    def correlation(self) -> np.ndarray:
+        return np.atleast_2d(np.corrcoef(self.returns))
+
+    def risk_contributions(self) -> pl.DataFrame:
+        """
+        per symbol : weight, volatility, marginal contribution d(sigma_p)/d(w) = (cov @ w) / sigma_p,
+        contribution w * marginal (the contributions sum to sigma_p) and its share of sigma_p
+        """
+        cov = self.covariance()
+        cov_w = cov @ self.weights
+        sigma = np.sqrt(self.weights @ cov_w)
+        marginal = cov_w / sigma if sigma > 0 else np.zeros_like(cov_w)
+        contribution = self.weights * marginal
+
+        return pl.DataFrame({
+            "symbol": self.symbols,
+            "weight": self.weights,
+            "volatility": np.sqrt(np.diag(cov)),
+            "marginal_risk": marginal,
+            "risk_contribution": contribution,
+            "risk_share": contribution / sigma if sigma > 0 else np.zeros_like(contribution),
+        })
+
+    def matrix_frame(self, matrix: np.ndarray) -> pl.DataFrame:
+        # symbol x symbol matrix (covariance / correlation) as a labelled frame
+        return pl.DataFrame({"symbol": self.symbols, **{s: matrix[:, i] for i, s in enumerate(self.symbols)}})
+
+
+if __name__ == "__main__":
+    import json
+    from data_loader import load_data_polars
+    from parallel import compute_metrics_threading
+
+    window = 20
+    file_path = "./data/market_data-1.csv"
+
+    df_polars, _, _ = load_data_polars(file_path)
+    symbols = df_polars["symbol"].unique().sort().to_list()
+    results = compute_metrics_threading(df_polars, symbols, lib="polars", window=window)
+
+    with open("./data/portfolio_structure-1.json") as f:
+        weights = weights_from_structure(json.load(f))
+
+    analytics = PortfolioAnalytics(results, weights)
+    df_portfolio, elapsed_time = analytics.rolling_metrics(window)
+    print(df_portfolio.tail())
+    print(analytics.matrix_frame(analytics.correlation()))
+    print(analytics.risk_contributions())
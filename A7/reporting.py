@@ -0,0 +1,140 @@
+import os
+import queue
+import threading
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# sentinel that tells the background thread to finish
+_CLOSE = object()
+
+
+def _to_arrow(df) -> pa.Table:
+    if isinstance(df, pl.DataFrame):
+        return df.to_arrow()
+    # pandas frames from rolling_metrics_pandas keep timestamp as their index
+    return pa.Table.from_pandas(df, preserve_index=df.index.name is not None)
+
+
+class StreamingReportWriter:
+    """
+    Writes metric frames to one Parquet file (Arrow IPC for a .arrow/.feather path) while they are produced.
+    write(symbol, df) only queues the frame ; a background thread converts it to Arrow and appends it in
+    row groups of at most row_group_size rows, so writes overlap with the compute of the next symbols.
+    The queue holds at most max_pending frames, a producer far ahead of the disk waits instead of buffering
+    every result in memory.
+    """
+    def __init__(self, path: str, row_group_size: int = 64 * 1024, max_pending: int = 8):
+        self.path = path
+        self.row_group_size = row_group_size
+        self.ipc = os.path.splitext(path)[1] in (".arrow", ".feather")
+        self.rows = 0
+        self.symbols = []
+        self.error = None
+        self._sink = None
+        self._schema = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, symbol: str, df):
+        if self.error is not None:
+            raise self.error
+        self._queue.put((symbol, df))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _CLOSE:
+                break
+            if self.error is not None:
+                # keep draining so producers never block on a dead writer
+                continue
+            try:
+                self._append(*item)
+            except Exception as e:
+                self.error = e
+
+    def _append(self, symbol, df):
+        table = _to_arrow(df)
+        if self._sink is None:
+            self._schema = table.schema
+            if self.ipc:
+                self._sink = pa.ipc.new_file(self.path, self._schema)
+            else:
+                self._sink = pq.ParquetWriter(self.path, self._schema)
+        # same columns for every symbol, only the physical types may differ (e.g. an all-null column)
+        table = table.select(self._schema.names).cast(self._schema)
+
+        if self.ipc:
+            self._sink.write_table(table, max_chunksize=self.row_group_size)
+        else:
+            self._sink.write_table(table, row_group_size=self.row_group_size)
+        self.rows += table.num_rows
+        self.symbols.append(symbol)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(_CLOSE)
+            self._thread.join()
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def summary_table(reports: list) -> pl.DataFrame:
+    """
+    one row per benchmark report (see benchmark.run_benchmark) : median time and CPU, peak memory
+    """
+    return pl.DataFrame([{
+        "backend": report["name"],
+        "runs": report["repeat"],
+        "wall_s": report["summary"]["wall_s"]["median"],
+        "cpu_percent": report["summary"]["cpu_percent"]["median"],
+        "peak_rss_mib": report["summary"]["peak_rss_mib"]["max"],
+        "peak_uss_mib": report["summary"]["peak_uss_mib"]["max"],
+        "processes": report["summary"]["processes"]["max"],
+    } for report in reports])
+
+
+def write_summary(reports: list, file_path: str) -> pl.DataFrame:
+    # csv, or markdown table for a .md path
+    summary = summary_table(reports)
+    if file_path.endswith(".md"):
+        with pl.Config(tbl_formatting="MARKDOWN", tbl_hide_column_data_types=True, tbl_hide_dataframe_shape=True,
+                       tbl_rows=-1, tbl_cols=-1, fmt_str_lengths=100, tbl_width_chars=1000):
+            with open(file_path, "w") as f:
+                f.write(str(summary) + "\n")
+    else:
+        summary.write_csv(file_path)
+    return summary
+
+
+if __name__ == "__main__":
+    from benchmark import run_benchmark
+    from data_loader import load_data_polars
+    from parallel import compute_metrics_threading, compute_metrics_multiprocessing
+
+    window = 20
+    file_path = "./data/market_data-1.csv"
+
+    df_polars, _, _ = load_data_polars(file_path)
+    symbols = df_polars["symbol"].unique().sort().to_list()
+
+    reports = []
+    for name, func in [("Threading (Polars)", compute_metrics_threading),
+                       ("Multiprocessing (Polars)", compute_metrics_multiprocessing)]:
+        with StreamingReportWriter(f"metrics_{func.__name__}.parquet") as writer:
+            _, report = run_benchmark(func, df_polars, symbols, name=name, warmup=0, repeat=1, lib="polars",
+                                      window=window, writer=writer)
+        reports.append(report)
+
+    print(write_summary(reports, "summary.md"))
@@ -0,0 +1,97 @@
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+import polars as pl
+
+
+def _column_arrays(df) -> tuple:
+    # returns ({column: numpy array}, index name or None)
+    if isinstance(df, pl.DataFrame):
+        return {col: df[col].to_numpy() for col in df.columns}, None
+    index_name = df.index.name
+    if index_name is not None:
+        df = df.reset_index()
+    return {col: df[col].to_numpy() for col in df.columns}, index_name
+
+
+class SharedFrame:
+    """
+    Publishes a pandas/polars frame once in a single shared memory block, rows sorted by symbol.
+    Workers receive only the small picklable `handle` and rebuild the rows of one symbol with attach_symbol,
+    so the frame is never pickled per task and peak RSS does not grow with the number of workers.
+    Text columns are stored as int32 codes plus a category list.
+    """
+    def __init__(self, df, symbol_col: str = "symbol"):
+        arrays, index_name = _column_arrays(df)
+
+        codes, symbols = pd.factorize(arrays[symbol_col], sort=True)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(symbols)))])
+        ranges = {symbol: (int(bounds[i]), int(bounds[i + 1])) for i, symbol in enumerate(symbols.tolist())}
+
+        columns, stored, offset = [], [], 0
+        for col, values in arrays.items():
+            categories = None
+            if values.dtype.kind in "OUS":
+                values, categories = pd.factorize(values)
+                values, categories = values.astype(np.int32), categories.tolist()
+            dtype = values.dtype.str
+            if values.dtype.kind == "M":
+                values = values.view(np.int64)
+            values = np.ascontiguousarray(values[order])
+            columns.append({"name": col, "dtype": dtype, "store": values.dtype.str, "offset": offset,
+                            "categories": categories})
+            stored.append(values)
+            # keep every column 8-byte aligned
+            offset += -(-values.nbytes // 8) * 8
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, offset))
+        for column, values in zip(columns, stored):
+            np.ndarray(values.shape, dtype=values.dtype, buffer=self.shm.buf, offset=column["offset"])[:] = values
+
+        self.handle = {
+            "name": self.shm.name,
+            "lib": "polars" if isinstance(df, pl.DataFrame) else "pandas",
+            "length": len(order),
+            "columns": columns,
+            "index": index_name,
+            "ranges": ranges,
+        }
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_symbol(handle: dict, symbol: str):
+    """
+    attach to a published SharedFrame by name and copy out the rows of one symbol as a pandas/polars frame
+    """
+    start, end = handle["ranges"].get(symbol, (0, 0))
+    shm = shared_memory.SharedMemory(name=handle["name"])
+    try:
+        data = {}
+        for column in handle["columns"]:
+            view = np.ndarray((handle["length"],), dtype=column["store"], buffer=shm.buf, offset=column["offset"])
+            values = view[start:end].copy()
+            if column["categories"] is not None:
+                values = np.asarray(column["categories"], dtype=object)[values]
+            elif np.dtype(column["dtype"]).kind == "M":
+                values = values.view(column["dtype"])
+            data[column["name"]] = values
+            del view
+    finally:
+        shm.close()
+
+    if handle["lib"] == "polars":
+        return pl.DataFrame(data)
+    df = pd.DataFrame(data)
+    if handle["index"] is not None:
+        df = df.set_index(handle["index"])
+    return df
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+# A7 modules are imported inside the fixtures : the root conftest.py only puts A7 on the path for A7 tests
+
+
+@pytest.fixture(scope="session")
+def market_data_csv(tmp_path_factory):
+    # three symbols ticking every second, random walks on a 0.01 grid, rows interleaved like the assignment data
+    rng = np.random.default_rng(11)
+    n = 2000
+    timestamps = pd.date_range("2025-01-01 09:30:00", periods=n, freq="s")
+    frames = []
+    for symbol, start in [("AAPL", 150.0), ("MSFT", 300.0), ("SPY", 430.0)]:
+        prices = np.round(start + np.cumsum(rng.normal(0, 0.2, n)), 2)
+        frames.append(pd.DataFrame({"timestamp": timestamps, "symbol": symbol, "price": prices}))
+    df = pd.concat(frames).sort_values(["timestamp", "symbol"], kind="stable")
+
+    path = tmp_path_factory.mktemp("data") / "market_data.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def df_pandas(market_data_csv):
+    from data_loader import load_data_pandas
+    return load_data_pandas(market_data_csv)[0]
+
+
+@pytest.fixture(scope="session")
+def df_polars(market_data_csv):
+    from data_loader import load_data_polars
+    return load_data_polars(market_data_csv)[0]
@@ -0,0 +1,81 @@
+import json
+import subprocess
+import sys
+import psutil
+import pytest
+from benchmark import run_benchmark, write_report, compare_reports
+
+# burns CPU for `seconds`, says so on stdout, then waits until its stdin is closed
+BURN = "import sys, time\nend = time.process_time() + float(sys.argv[1])\nwhile time.process_time() < end: pass\n" \
+       "print('burnt', flush=True)\nsys.stdin.read()\n"
+
+
+def _burner(seconds: float) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-c", BURN, str(seconds)], stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE)
+
+
+def _burn_and_reap(seconds: float):
+    child = _burner(seconds)
+    child.communicate()
+
+
+def _children() -> int:
+    # e.g. multiprocessing's resource tracker, once an earlier test used shared memory
+    return len(psutil.Process().children(recursive=True))
+
+
+def test_report_shape_and_json(tmp_path):
+    calls = []
+    children = _children()
+    result, report = run_benchmark(lambda x: calls.append(x) or x * 2, 21, name="double", warmup=2, repeat=3,
+                                   interval=0.01)
+
+    assert result == 42 and len(calls) == 5
+    assert report["name"] == "double" and (report["warmup"], report["repeat"]) == (2, 3)
+    assert len(report["runs"]) == 3
+    metrics = {"wall_s", "user_s", "sys_s", "cpu_percent", "baseline_rss_mib", "peak_rss_mib", "peak_uss_mib",
+               "ctx_voluntary", "ctx_involuntary", "processes"}
+    assert set(report["runs"][0]) == metrics and set(report["summary"]) == metrics
+    for stats in report["summary"].values():
+        assert stats["min"] <= stats["median"] <= stats["max"] and stats["min"] <= stats["mean"] <= stats["max"]
+    assert report["summary"]["processes"]["max"] == 1 + children
+
+    path = str(tmp_path / "report.json")
+    write_report([report], path)
+    with open(path) as f:
+        assert json.load(f) == [report]
+
+
+def test_children_started_during_the_run_are_counted():
+    children = _children()
+    _, report = run_benchmark(_burn_and_reap, 0.4, warmup=0, repeat=1, interval=0.01)
+    run = report["runs"][0]
+    assert run["user_s"] + run["sys_s"] >= 0.35
+    assert run["processes"] == 2 + children
+
+
+def test_children_reaped_during_the_run_only_count_the_run():
+    child = _burner(0.5)
+    try:
+        # let the child spend its CPU before the measured run starts
+        assert child.stdout.readline() == b"burnt\n"
+        _, report = run_benchmark(child.communicate, warmup=0, repeat=1, interval=0.01)
+    finally:
+        child.kill()
+        child.wait()
+
+    run = report["runs"][0]
+    # the child exits and is reaped inside the run : its 0.5s of earlier work is not part of it
+    assert run["user_s"] + run["sys_s"] < 0.25
+
+
+def test_compare_reports_flags_regressions():
+    def report(median):
+        return {"name": "polars", "summary": {"wall_s": {"median": median}}}
+
+    assert compare_reports(report(1.0), report(1.05))["regression"] is False
+    check = compare_reports(report(1.0), report(1.5), tolerance=0.2)
+    assert check["regression"] is True and check["ratio"] == pytest.approx(1.5)
+    assert compare_reports(report(0.0), report(1.0))["ratio"] == float("inf")
+    json.dumps(check)
@@ -0,0 +1,83 @@
+import os
+import pandas as pd
+import polars as pl
+import pytest
+from cache import MetricsCache, cached_rolling_metrics, metrics_key, _nbytes
+from metrics import rolling_metrics_pandas, rolling_metrics_polars
+
+
+def _frame(i: int, n: int = 1000) -> pl.DataFrame:
+    return pl.DataFrame({"price": [float(i)] * n})
+
+
+def test_memory_tier_evicts_least_recently_used():
+    size = _nbytes(_frame(0))
+    cache = MetricsCache(max_bytes=3 * size)
+    for i in range(3):
+        cache.put(i, _frame(i))
+    # touching 0 makes 1 the least recently used entry
+    assert cache.get(0)["price"][0] == 0.0
+    cache.put(3, _frame(3))
+
+    assert list(cache.entries) == [2, 0, 3]
+    assert cache.get(1) is None
+    info = cache.cache_info()
+    assert info["evictions"] == 1 and info["evicted_bytes"] == size
+    assert info["entries"] == 3 and info["bytes"] == 3 * size <= info["max_bytes"]
+
+    # a frame over the whole budget is not held, and nothing is evicted for it
+    cache.put(4, _frame(4, n=10_000))
+    assert 4 not in cache.entries and list(cache.entries) == [2, 0, 3]
+    assert cache.cache_info()["oversized"] == 1
+
+
+def test_hit_and_miss_statistics():
+    cache = MetricsCache()
+    assert cache.cache_info()["hit_rate"] == 0.0
+    assert cache.get("a") is None
+    cache.put("a", _frame(1))
+    cache.get("a")
+    cache.get("a")
+
+    info = cache.cache_info()
+    assert (info["memory_hits"], info["disk_hits"], info["misses"]) == (2, 0, 1)
+    assert info["hit_rate"] == pytest.approx(2 / 3)
+    assert info["disk_writes"] == info["disk_files"] == 0
+
+
+def test_disk_round_trip_and_promotion(tmp_path, df_pandas, df_polars):
+    cache = MetricsCache(directory=str(tmp_path))
+    expected_pandas, _ = rolling_metrics_pandas(df_pandas, "AAPL", ["price"], 20)
+    expected_polars, _ = rolling_metrics_polars(df_polars, "AAPL", ["price"], 20)
+    cache.put("pandas", expected_pandas)
+    cache.put("polars", expected_polars)
+    assert cache.cache_info()["disk_files"] == 2
+
+    # dropping the memory tier leaves the entries on disk, a hit promotes them back
+    cache.clear()
+    actual_pandas = cache.get("pandas")
+    actual_polars = cache.get("polars")
+    pd.testing.assert_frame_equal(actual_pandas, expected_pandas)
+    assert actual_pandas.index.name == "timestamp"
+    assert actual_polars.equals(expected_polars)
+    assert cache.cache_info()["disk_hits"] == 2 and list(cache.entries) == ["pandas", "polars"]
+    assert cache.get("polars") is actual_polars
+
+    # a new cache on the same directory starts warm
+    assert MetricsCache(directory=str(tmp_path)).get("polars").equals(expected_polars)
+    cache.clear(disk=True)
+    assert os.listdir(tmp_path) == []
+
+
+def test_cached_rolling_metrics_keys_by_library_and_window(df_pandas, df_polars):
+    cache = MetricsCache()
+    polars_20, _ = cached_rolling_metrics(cache, "f1", df_polars, "MSFT", ["price"], 20)
+    pandas_20, _ = cached_rolling_metrics(cache, "f1", df_pandas, "MSFT", ["price"], 20)
+    assert isinstance(polars_20, pl.DataFrame) and isinstance(pandas_20, pd.DataFrame)
+    assert cached_rolling_metrics(cache, "f1", df_polars, "MSFT", ["price"], 20)[0] is polars_20
+    cached_rolling_metrics(cache, "f1", df_polars, "MSFT", ["price"], 5)
+    # another file fingerprint never hits the old entries
+    cached_rolling_metrics(cache, "f2", df_polars, "MSFT", ["price"], 20)
+
+    assert cache.stats["memory_hits"] == 1 and cache.stats["misses"] == 4
+    assert metrics_key("f1", "MSFT", 20, ["price"], "polars") in cache.entries
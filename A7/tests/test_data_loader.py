@@ -0,0 +1,54 @@
+import os
+import shutil
+import pandas as pd
+import pytest
+from data_loader import load_data_pandas, load_data_polars, _parse_ticks
+from tick_cache import cache_paths, load_cached_ticks, read_ticks
+
+
+@pytest.fixture
+def csv_path(tmp_path, market_data_csv):
+    # the cache is written next to the csv : work on a copy
+    path = str(tmp_path / "market_data.csv")
+    shutil.copy(market_data_csv, path)
+    return path
+
+
+def test_cached_loads_match_the_csv(csv_path):
+    expected_pandas, _, _ = load_data_pandas(csv_path)
+    expected_polars, _, _ = load_data_polars(csv_path)
+
+    # first call builds the cache, the second memory-maps it
+    for _ in range(2):
+        cached_pandas, _, _ = load_data_pandas(csv_path, use_cache=True)
+        pd.testing.assert_frame_equal(cached_pandas, expected_pandas)
+        assert cached_pandas.index.dtype == expected_pandas.index.dtype
+        assert load_data_polars(csv_path, use_cache=True)[0].equals(expected_polars)
+    assert all(os.path.exists(p) for p in cache_paths(csv_path))
+
+
+def test_rewritten_csv_invalidates_the_cache(csv_path):
+    load_data_pandas(csv_path, use_cache=True)
+    with open(csv_path, "a") as f:
+        f.write("2025-01-02 09:30:00,AAPL,151.25\n")
+
+    df, _, _ = load_data_pandas(csv_path, use_cache=True)
+    assert len(df) == len(load_data_pandas(csv_path)[0])
+    assert df["price"].iloc[-1] == 151.25
+
+
+def test_csv_changed_during_parse_is_not_cached_as_fresh(csv_path):
+    def parse_then_append(path):
+        parsed = _parse_ticks(path)
+        with open(path, "a") as f:
+            f.write("2025-01-02 09:30:00,AAPL,151.25\n")
+        return parsed
+
+    timestamps, _, prices, _ = load_cached_ticks(csv_path, parse_then_append)
+    rows = len(prices)
+    assert len(timestamps) == rows
+
+    # the cache describes the csv before the append : it is already stale
+    assert read_ticks(csv_path) is None
+    _, _, prices, _ = load_cached_ticks(csv_path, _parse_ticks)
+    assert len(prices) == rows + 1 and prices[-1] == 151.25
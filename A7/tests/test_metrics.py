@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+import polars as pl
+from data_loader import scan_data_polars
+from metrics import (rolling_metrics_pandas, rolling_metrics_polars, rolling_metrics_polars_lazy, rolling_metrics_all,
+                     RollingMetricsState, minmax_downsample, plot_rolling_metrics)
+
+SYMBOLS = ["AAPL", "MSFT", "SPY"]
+# documented tolerance of RollingMetricsState against the batch functions, relative to each column's scale
+# (rolling return means cross zero, where a pure relative tolerance is meaningless)
+RTOL = 1e-9
+
+
+def _assert_columns_close(actual, expected, columns, rtol=RTOL):
+    for col in columns:
+        desired = np.asarray(expected[col], dtype=np.float64)
+        scale = np.nanmax(np.abs(desired[np.isfinite(desired)]))
+        np.testing.assert_allclose(np.asarray(actual[col], dtype=np.float64), desired,
+                                   rtol=rtol, atol=rtol * scale, equal_nan=True, err_msg=col)
+
+
+def test_rolling_metrics_state_single_ticks_match_batch(df_pandas, df_polars):
+    for window in [2, 5, 20]:
+        expected, _ = rolling_metrics_pandas(df_pandas, "AAPL", ["price"], window)
+        expected_polars, _ = rolling_metrics_polars(df_polars, "AAPL", ["price"], window)
+
+        state = RollingMetricsState("AAPL", ["price"], window)
+        rows = [state.update({"price": price}) for price in expected["price"]]
+        actual = {col: [row[col] for row in rows] for col in state.columns()}
+
+        if window > 2:
+            _assert_columns_close(actual, expected, state.columns())
+            _assert_columns_close(actual, expected_polars, state.columns())
+        else:
+            # window 2 is ill-conditioned : pandas' rolling std of two equal prices is ~1e-7 instead of 0, and
+            # polars' pct_change rounds differently, which near-tied returns blow up in the Sharpe ratio
+            _assert_columns_close(actual, expected, [c for c in state.columns() if c != "price_STD_2"])
+            _assert_columns_close(actual, expected_polars, ["price_MA_2", "price_STD_2"])
+            ties = expected["price"].diff().to_numpy() == 0
+            assert np.all(np.asarray(actual["price_STD_2"])[ties] == 0)
+
+
+def test_rolling_metrics_state_micro_batches_match_batch(df_pandas, df_polars):
+    window = 20
+    expected, _ = rolling_metrics_pandas(df_pandas, "MSFT", ["price"], window)
+    expected_polars, _ = rolling_metrics_polars(df_polars, "MSFT", ["price"], window)
+    bounds = [0, 1, 7, window, 333, 1500, len(df_pandas)]
+
+    # pandas micro-batches : other symbols in the batch are ignored
+    state = RollingMetricsState("MSFT", ["price"], window)
+    parts = [state.append(df_pandas.iloc[start:end])[0] for start, end in zip(bounds, bounds[1:])]
+    actual = pd.concat(parts)
+    assert list(actual.columns) == list(expected.columns)
+    assert actual.index.equals(expected.index)
+    _assert_columns_close(actual, expected, state.columns())
+
+    state = RollingMetricsState("MSFT", ["price"], window)
+    parts = [state.append(df_polars.slice(start, end - start))[0] for start, end in zip(bounds, bounds[1:])]
+    actual_polars = pl.concat(parts)
+    assert actual_polars.columns == expected_polars.columns
+    _assert_columns_close(actual_polars, expected_polars, state.columns())
+
+
+def test_rolling_metrics_all_matches_per_symbol(df_pandas, df_polars):
+    window = 20
+    all_pandas, _ = rolling_metrics_all(df_pandas, ["price"], window)
+    all_polars, _ = rolling_metrics_all(df_polars, ["price"], window)
+
+    for symbol in SYMBOLS:
+        expected, _ = rolling_metrics_pandas(df_pandas, symbol, ["price"], window)
+        actual = all_pandas[all_pandas["symbol"] == symbol]
+        assert list(actual.columns) == list(expected.columns)
+        assert actual.index.equals(expected.index)
+        _assert_columns_close(actual, expected, expected.columns.drop("symbol"), rtol=1e-12)
+
+        expected_polars, _ = rolling_metrics_polars(df_polars, symbol, ["price"], window)
+        actual_polars = all_polars.filter(pl.col("symbol") == symbol)
+        assert actual_polars.columns == expected_polars.columns
+        assert actual_polars["timestamp"].equals(expected_polars["timestamp"])
+        _assert_columns_close(actual_polars, expected_polars, expected_polars.columns[2:], rtol=1e-12)
+
+
+def test_lazy_scan_matches_per_symbol(market_data_csv, df_polars):
+    for streaming in [False, True]:
+        lf = scan_data_polars(market_data_csv, ["AAPL", "SPY"])
+        actual, _ = rolling_metrics_polars_lazy(lf, ["price"], 20, streaming=streaming)
+        # the symbol filter is applied in the scan
+        assert sorted(actual["symbol"].unique().to_list()) == ["AAPL", "SPY"]
+        for symbol in ["AAPL", "SPY"]:
+            expected, _ = rolling_metrics_polars(df_polars, symbol, ["price"], 20)
+            # the streaming engine does not promise the row order : compare each symbol in timestamp order
+            actual_symbol = actual.filter(pl.col("symbol") == symbol).sort("timestamp")
+            assert actual_symbol.select(expected.columns).equals(expected)
+
+    # without a filter every symbol is computed
+    actual, _ = rolling_metrics_polars_lazy(scan_data_polars(market_data_csv), ["price"], 5)
+    assert actual.height == df_polars.height
+
+
+def test_minmax_downsample_keeps_bucket_extremes_and_endpoints():
+    y = np.cumsum(np.random.default_rng(3).normal(size=10_007))
+    keep = minmax_downsample(y, 100)
+
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+    assert np.all(np.diff(keep) > 0) and len(keep) <= 2 * 100 + 2
+    size = -(-len(y) // 100)
+    for start in range(0, len(y), size):
+        bucket = y[start:start + size]
+        kept = y[keep[(keep >= start) & (keep < start + size)]]
+        assert bucket.min() in kept and bucket.max() in kept
+
+    # short series are drawn as they are
+    assert minmax_downsample(y[:200], 100).tolist() == list(range(200))
+
+
+def test_minmax_downsample_skips_nan():
+    y = np.arange(1000, dtype=np.float64)
+    y[:20] = np.nan       # rolling warm-up, the first bucket is only NaN
+    y[105] = np.nan
+    keep = minmax_downsample(y, 50)
+
+    # a NaN is kept only as the first point or for the all-NaN bucket, never over real values
+    assert np.isnan(y[keep]).sum() == 1 and keep[0] == 0
+    assert 105 not in keep and {100, 119, 999} <= set(keep.tolist())
+
+
+def test_plot_rolling_metrics_writes_the_figure(tmp_path, df_pandas, df_polars):
+    for lib, df, rolling_metrics in [("pandas", df_pandas, rolling_metrics_pandas),
+                                     ("polars", df_polars, rolling_metrics_polars)]:
+        metrics, _ = rolling_metrics(df, "AAPL", ["price"], 20)
+        path = str(tmp_path / f"rolling_metrics_{lib}.png")
+        assert plot_rolling_metrics(metrics, window=20, subsample_size=500, output_path=path,
+                                    figsize=(4, 3), dpi=50) == path
+        with open(path, "rb") as f:
+            assert f.read(8) == b"\x89PNG\r\n\x1a\n"
@@ -0,0 +1,93 @@
+import os
+import sys
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+import numpy as np
+import pytest
+import parallel
+from parallel import compute_metrics_threading, compute_metrics_multiprocessing, MetricsWorkerPool, balanced_batches
+from metrics import rolling_metrics_pandas, rolling_metrics_polars
+
+SYMBOLS = ["AAPL", "MSFT", "SPY"]
+
+
+def _assert_same_frames(results, df, rolling_metrics, window=20):
+    assert sorted(results) == SYMBOLS
+    for symbol in SYMBOLS:
+        actual, _ = results[symbol]
+        assert actual.equals(rolling_metrics(df, symbol, ["price"], window)[0])
+
+
+@pytest.mark.parametrize("compute", [compute_metrics_threading, compute_metrics_multiprocessing])
+def test_compute_metrics_matches_per_symbol(compute, df_pandas, df_polars):
+    _assert_same_frames(compute(df_pandas, SYMBOLS, lib="pandas", max_workers=2), df_pandas, rolling_metrics_pandas)
+    _assert_same_frames(compute(df_polars, SYMBOLS, lib="polars", max_workers=2), df_polars, rolling_metrics_polars)
+
+
+def test_worker_pool_is_reused_across_windows(df_polars):
+    timings = []
+    with MetricsWorkerPool(df_polars, max_workers=2) as pool:
+        assert pool.lib == "polars"
+        for window in [5, 20]:
+            results = pool.rolling_metrics(SYMBOLS, window=window, timings=timings)
+            _assert_same_frames(results, df_polars, rolling_metrics_polars, window)
+
+        batch_results, _ = pool.submit(["SPY"], window=10).result()
+        assert batch_results["SPY"][0].equals(rolling_metrics_polars(df_polars, "SPY", ["price"], 10)[0])
+
+    # every batch covers its symbols' rows, all symbols once per run
+    assert sorted(s for t in timings for s in t["symbols"]) == sorted(SYMBOLS * 2)
+    assert sum(t["rows"] for t in timings) == 2 * df_polars.height
+
+
+@pytest.mark.parametrize("compute", [compute_metrics_threading, compute_metrics_multiprocessing])
+def test_compute_metrics_rejects_unknown_library(compute, df_pandas):
+    with pytest.raises(ValueError):
+        compute(df_pandas, SYMBOLS, lib="numpy")
+
+
+def test_worker_pool_start_up_failure_raises_and_releases_the_frame(df_polars, monkeypatch):
+    frames = []
+
+    class RecordedFrame(parallel.SharedFrame):
+        def __init__(self, df):
+            super().__init__(df)
+            frames.append(self)
+
+    # every worker's initializer exits : the pool is broken before it serves anything
+    monkeypatch.setattr(parallel, "_init_worker", sys.exit)
+    monkeypatch.setattr(parallel, "SharedFrame", RecordedFrame)
+    with pytest.raises(BrokenProcessPool):
+        MetricsWorkerPool(df_polars, max_workers=1)
+
+    # the block was unlinked : attaching to it by name fails
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=frames[0].handle["name"])
+
+
+def test_balanced_batches_cover_every_symbol_once():
+    rng = np.random.default_rng(5)
+    counts = {f"S{i:02d}": int(c) for i, c in enumerate(rng.integers(1, 10_000, 37))}
+    for n_batches in [1, 2, 3, 8, 37, 100]:
+        batches = balanced_batches(counts, n_batches)
+        assert sorted(s for batch in batches for s in batch) == sorted(counts)
+        assert len(batches) == min(n_batches, len(counts)) and all(batches)
+        # longest-processing-time : the heaviest and lightest batch differ by at most one symbol's rows
+        loads = [sum(counts[s] for s in batch) for batch in batches]
+        assert max(loads) - min(loads) <= max(counts.values())
+
+    assert balanced_batches({"A": 10, "B": 9, "C": 8, "D": 7, "E": 1}, 2) == [["A", "D", "E"], ["B", "C"]]
+    assert balanced_batches({}, 4) == []
+
+
+def test_thread_env_sets_and_restores_the_limits(monkeypatch):
+    monkeypatch.setenv("OMP_NUM_THREADS", "3")
+    monkeypatch.delenv("POLARS_MAX_THREADS", raising=False)
+
+    with pytest.raises(RuntimeError):
+        with parallel._thread_env(2):
+            assert all(os.environ[var] == "2" for var in parallel.THREAD_ENV_VARS)
+            raise RuntimeError
+    # previous values come back, variables that were not set are removed again, also after an error
+    assert os.environ["OMP_NUM_THREADS"] == "3"
+    assert "POLARS_MAX_THREADS" not in os.environ
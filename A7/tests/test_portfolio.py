@@ -0,0 +1,75 @@
+import json
+import os
+import numpy as np
+import polars as pl
+import pytest
+from metrics import rolling_metrics_polars
+from portfolio import PortfolioAnalytics, returns_matrix, weights_from_structure
+
+SYMBOLS = ["AAPL", "MSFT", "SPY"]
+STRUCTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data",
+                         "portfolio_structure-1.json")
+
+
+@pytest.fixture(scope="module")
+def results(df_polars):
+    return {s: rolling_metrics_polars(df_polars, s, ["price"], 20) for s in SYMBOLS}
+
+
+def test_weights_from_structure_include_sub_portfolios():
+    with open(STRUCTURE) as f:
+        weights = weights_from_structure(json.load(f))
+
+    values = {"AAPL": 100 * 172.35, "MSFT": 50 * 328.10, "SPY": 20 * 430.50}
+    assert weights == pytest.approx({s: v / sum(values.values()) for s, v in values.items()})
+
+
+def test_returns_matrix_aligns_symbols_on_timestamps(results):
+    symbols, timestamps, matrix = returns_matrix(results)
+    assert symbols == SYMBOLS
+    assert matrix.shape == (3, len(timestamps))
+    # every symbol ticks every second : each row is that symbol's returns, the first one 0
+    expected = results["MSFT"][0]["price"].pct_change().fill_null(0.0)
+    np.testing.assert_array_equal(matrix[1], expected.to_numpy())
+
+    # a symbol missing a tick gets a 0 return there
+    short = {"AAPL": results["AAPL"], "SPY": (results["SPY"][0].slice(0, 100), 0.0)}
+    _, _, matrix = returns_matrix(short)
+    assert matrix.shape == (2, results["AAPL"][0].height)
+    assert not matrix[1, 100:].any()
+
+
+def test_risk_contributions_sum_to_portfolio_volatility(results):
+    analytics = PortfolioAnalytics(results, {"AAPL": 0.5, "MSFT": 0.3, "SPY": 0.2})
+    np.testing.assert_allclose(analytics.covariance(), np.cov(analytics.returns, ddof=1), rtol=1e-12)
+    np.testing.assert_allclose(analytics.correlation(), np.corrcoef(analytics.returns), rtol=1e-12)
+
+    sigma = np.std(analytics.portfolio_returns(), ddof=1)
+    risk = analytics.risk_contributions()
+    assert risk["symbol"].to_list() == SYMBOLS
+    assert risk["risk_contribution"].sum() == pytest.approx(sigma, rel=1e-9)
+    assert risk["risk_share"].sum() == pytest.approx(1.0, rel=1e-9)
+
+
+def test_single_symbol_portfolio(results):
+    analytics = PortfolioAnalytics({"SPY": results["SPY"]}, {"SPY": 1.0})
+    assert analytics.covariance().shape == (1, 1)
+    assert analytics.correlation().shape == (1, 1)
+
+    risk = analytics.risk_contributions()
+    sigma = np.std(analytics.returns[0], ddof=1)
+    assert risk["volatility"].to_list() == pytest.approx([sigma], rel=1e-12)
+    assert risk["risk_share"].to_list() == pytest.approx([1.0])
+
+
+def test_rolling_metrics_and_weight_checks(results):
+    analytics = PortfolioAnalytics(results, [0.2, 0.3, 0.5])
+    df_portfolio, _ = analytics.rolling_metrics(10)
+
+    rets = pl.Series(analytics.portfolio_returns())
+    assert df_portfolio.height == len(analytics.timestamps)
+    np.testing.assert_allclose(df_portfolio["portfolio_vol_10"].to_numpy(),
+                               rets.rolling_std(window_size=10, ddof=1).to_numpy(), rtol=1e-12)
+
+    with pytest.raises(ValueError):
+        PortfolioAnalytics(results, [0.5, 0.5])
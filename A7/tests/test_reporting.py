@@ -0,0 +1,77 @@
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from parallel import compute_metrics_threading
+from reporting import StreamingReportWriter, summary_table, write_summary
+
+SYMBOLS = ["AAPL", "MSFT", "SPY"]
+
+
+@pytest.mark.parametrize("lib", ["pandas", "polars"])
+def test_writer_streams_every_symbol_in_row_groups(tmp_path, lib, df_pandas, df_polars):
+    df = df_pandas if lib == "pandas" else df_polars
+    path = str(tmp_path / "metrics.parquet")
+    with StreamingReportWriter(path, row_group_size=512, max_pending=1) as writer:
+        results = compute_metrics_threading(df, SYMBOLS, lib=lib, max_workers=2, writer=writer)
+
+    assert sorted(writer.symbols) == SYMBOLS
+    assert writer.rows == len(df)
+    metadata = pq.ParquetFile(path).metadata
+    assert metadata.num_rows == len(df)
+    # 2000 rows per symbol : 3 full groups of 512 and one of 464 for each symbol
+    assert metadata.num_row_groups == 4 * len(SYMBOLS)
+    assert max(metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)) == 512
+
+    table = pq.read_table(path)
+    # pandas frames keep their timestamp index as a column
+    assert "timestamp" in table.column_names
+    first = pl.from_arrow(table).filter(pl.col("symbol") == writer.symbols[0])
+    assert first.height == len(results[writer.symbols[0]][0])
+
+
+def test_writer_arrow_ipc_path(tmp_path, df_polars):
+    path = str(tmp_path / "metrics.arrow")
+    with StreamingReportWriter(path, row_group_size=1000) as writer:
+        compute_metrics_threading(df_polars, SYMBOLS, lib="polars", writer=writer)
+
+    with pa.ipc.open_file(path) as reader:
+        assert reader.num_record_batches == 2 * len(SYMBOLS)
+        assert reader.read_all().num_rows == df_polars.height
+
+
+def test_writer_error_is_raised_on_close(tmp_path):
+    writer = StreamingReportWriter(str(tmp_path / "metrics.parquet"))
+    writer.write("AAPL", pl.DataFrame({"symbol": ["AAPL"], "price": [1.0]}))
+    # a frame without the schema's columns fails in the background thread
+    writer.write("MSFT", pl.DataFrame({"other": [1.0]}))
+    with pytest.raises(KeyError):
+        writer.close()
+    assert writer.symbols == ["AAPL"]
+    with pytest.raises(KeyError):
+        writer.write("SPY", pl.DataFrame({"symbol": ["SPY"], "price": [1.0]}))
+
+
+def _report(name: str, wall: float) -> dict:
+    summary = {"wall_s": {"median": wall}, "cpu_percent": {"median": 90.0}, "peak_rss_mib": {"max": 100.0},
+               "peak_uss_mib": {"max": 80.0}, "processes": {"max": 1}}
+    return {"name": name, "repeat": 3, "summary": summary}
+
+
+def test_summary_table_and_files(tmp_path):
+    reports = [_report("Threading (Polars)", 1.5), _report("Multiprocessing (Polars)", 0.5)]
+    summary = summary_table(reports)
+    assert summary["backend"].to_list() == ["Threading (Polars)", "Multiprocessing (Polars)"]
+    assert summary["wall_s"].to_list() == [1.5, 0.5]
+    assert summary.columns == ["backend", "runs", "wall_s", "cpu_percent", "peak_rss_mib", "peak_uss_mib",
+                               "processes"]
+
+    csv_path = str(tmp_path / "summary.csv")
+    write_summary(reports, csv_path)
+    assert pl.read_csv(csv_path).equals(summary)
+
+    md_path = str(tmp_path / "summary.md")
+    write_summary(reports, md_path)
+    with open(md_path) as f:
+        lines = f.read().splitlines()
+    assert lines[0].startswith("| backend") and len(lines) == 2 + len(reports)
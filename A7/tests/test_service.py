@@ -0,0 +1,56 @@
+import asyncio
+from data_loader import file_fingerprint
+from main import MetricsService
+from metrics import rolling_metrics_polars
+
+
+def test_identical_concurrent_requests_share_one_computation(market_data_csv, df_polars):
+    async def run():
+        async with MetricsService(market_data_csv, max_workers=2) as service:
+            requests = [("AAPL", 20), ("SPY", 20), ("AAPL", 5)] * 3
+            first = await asyncio.gather(*(service.rolling_metrics(s, w) for s, w in requests))
+            info = service.cache_info()
+            repeated = await asyncio.gather(*(service.rolling_metrics(s, w) for s, w in requests))
+            return requests, first, info, repeated, service.cache_info()
+
+    requests, first, info, repeated, repeated_info = asyncio.run(run())
+
+    for (symbol, window), (df_first, _), (df_repeated, elapsed) in zip(requests, first, repeated):
+        expected, _ = rolling_metrics_polars(df_polars, symbol, ["price"], window)
+        assert df_first.equals(expected)
+        # repeats are served from the cache
+        assert df_repeated is df_first and elapsed == 0.0
+
+    # 3 distinct requests computed once each, the 6 duplicates waited on them
+    assert info["deduplicated"] == 6 and info["misses"] == 3 and info["inflight"] == 0
+    assert repeated_info["memory_hits"] == len(requests)
+
+
+def test_failed_computation_reaches_every_waiter(market_data_csv):
+    async def run():
+        async with MetricsService(market_data_csv, max_workers=1) as service:
+            failed = await asyncio.gather(*(service.rolling_metrics("AAPL", 20, ("volume",)) for _ in range(3)),
+                                          return_exceptions=True)
+            # the failure is not cached and the service keeps serving
+            ok, _ = await service.rolling_metrics("AAPL", 20)
+            return failed, ok, service.cache_info()
+
+    failed, ok, info = asyncio.run(run())
+    assert len(failed) == 3 and all(isinstance(e, Exception) for e in failed)
+    assert info["inflight"] == 0 and info["entries"] == 1 and info["deduplicated"] == 2
+    assert ok.height > 0
+
+
+def test_service_fingerprints_the_loaded_file(market_data_csv):
+    async def run():
+        service = MetricsService(market_data_csv, lib="pandas", max_workers=1)
+        try:
+            await service.start()
+            df, _ = await service.rolling_metrics("MSFT", 10)
+            return service.fingerprint, df
+        finally:
+            service.close()
+
+    fingerprint, df = asyncio.run(run())
+    assert fingerprint == file_fingerprint(market_data_csv)
+    assert df.index.name == "timestamp" and len(df) > 0
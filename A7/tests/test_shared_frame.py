@@ -0,0 +1,33 @@
+import os
+import polars as pl
+from shared_frame import SharedFrame, attach_symbol
+from parallel import _rolling_metrics_shared
+from metrics import rolling_metrics_pandas, rolling_metrics_polars
+
+
+def test_attach_symbol_rebuilds_the_symbol_rows(df_pandas, df_polars):
+    with SharedFrame(df_pandas) as frame:
+        handle = frame.handle
+        for symbol in ["AAPL", "MSFT", "SPY"]:
+            expected = df_pandas[df_pandas["symbol"] == symbol]
+            actual = attach_symbol(handle, symbol)
+            assert actual.equals(expected)
+            assert actual.index.name == "timestamp"
+
+    with SharedFrame(df_polars) as frame:
+        for symbol in ["AAPL", "MSFT", "SPY"]:
+            assert attach_symbol(frame.handle, symbol).equals(df_polars.filter(pl.col("symbol") == symbol))
+        assert attach_symbol(frame.handle, "IBM").height == 0
+    # closing unlinks the block (visible as a file on Linux)
+    if os.path.isdir("/dev/shm"):
+        assert not os.path.exists(os.path.join("/dev/shm", handle["name"].lstrip("/")))
+
+
+def test_shared_worker_metrics_match_direct_call(df_pandas, df_polars):
+    with SharedFrame(df_pandas) as frame:
+        actual, _ = _rolling_metrics_shared(frame.handle, "MSFT", ["price"], 20, "pandas")
+    assert actual.equals(rolling_metrics_pandas(df_pandas, "MSFT", ["price"], 20)[0])
+
+    with SharedFrame(df_polars) as frame:
+        actual, _ = _rolling_metrics_shared(frame.handle, "MSFT", ["price"], 20, "polars")
+    assert actual.equals(rolling_metrics_polars(df_polars, "MSFT", ["price"], 20)[0])
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# A3, A6 and A7 share one binary tick cache : the implementation is shared/tick_cache.py at the repository root
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
+
+from shared.tick_cache import TICK_DTYPE, CACHE_VERSION, cache_paths, write_ticks, read_ticks, load_cached_ticks
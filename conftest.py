@@ -0,0 +1,60 @@
+import os
+import sys
+import pytest
+
+# A3, A6 and A7 are flat script directories whose modules share names (models, data_loader, reporting, main,
+# tick_cache). Each test module is imported, and each test runs, with only its own project's code directory on
+# sys.path and only that project's modules in sys.modules ; the other projects' modules are stashed and put back
+# on their turn.
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# project directory -> import path of its tests : the directory its scripts run from first (A3's tests also
+# import the scripts as the src package)
+PROJECTS = {os.path.join(ROOT, "A3"): [os.path.join(ROOT, "A3", "src"), os.path.join(ROOT, "A3")],
+            os.path.join(ROOT, "A6"): [os.path.join(ROOT, "A6")],
+            os.path.join(ROOT, "A7"): [os.path.join(ROOT, "A7")]}
+
+_stashed = {project: {} for project in PROJECTS}
+# pyproject.toml puts A6 on the pythonpath : it is the active project until another project's test comes up
+_active = {"project": os.path.join(ROOT, "A6")}
+
+
+def _project_of(path):
+    path = os.path.abspath(str(path))
+    for project in PROJECTS:
+        if path == project or path.startswith(project + os.sep):
+            return project
+    return None
+
+
+def _is_project_module(module, project):
+    # the project's own code, not its tests and conftests (pytest keeps those under their own names)
+    path = getattr(module, "__file__", None)
+    if not path or _project_of(path) != project:
+        return False
+    return not os.path.abspath(path).startswith(os.path.join(project, "tests") + os.sep)
+
+
+def _activate(project):
+    active = _active["project"]
+    if project is None or project == active:
+        return
+
+    sys.path[:] = [p for p in sys.path if not p or os.path.abspath(p) not in PROJECTS[active]]
+    for name, module in list(sys.modules.items()):
+        if _is_project_module(module, active):
+            _stashed[active][name] = sys.modules.pop(name)
+
+    sys.path[:0] = PROJECTS[project]
+    sys.modules.update(_stashed[project])
+    _stashed[project].clear()
+    _active["project"] = project
+
+
+def pytest_collectstart(collector):
+    if isinstance(collector, pytest.Module):
+        _activate(_project_of(collector.path))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    _activate(_project_of(item.path))
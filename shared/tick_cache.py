@@ -0,0 +1,90 @@
+import json
+import os
+import numpy as np
+
+# fixed-width on-disk record : 20 bytes per tick
+TICK_DTYPE = np.dtype([("timestamp", "<i8"), ("symbol_id", "<i4"), ("price", "<f8")])
+CACHE_VERSION = 1
+
+
+def cache_paths(csv_path: str) -> tuple:
+    return csv_path + ".ticks", csv_path + ".ticks.json"
+
+
+def _source_key(csv_path: str) -> dict:
+    # cache is invalidated whenever the source csv is rewritten or resized
+    stat = os.stat(csv_path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _read_meta(meta_path: str):
+    try:
+        with open(meta_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_ticks(csv_path: str, timestamps, symbol_ids, prices, symbols: list, source: dict = None) -> np.ndarray:
+    """
+    source : _source_key(csv_path) taken before the csv was parsed (default : now), so a csv rewritten while
+    it was being parsed leaves a cache that read_ticks already sees as stale
+    returns the written records
+    """
+    data_path, meta_path = cache_paths(csv_path)
+
+    records = np.empty(len(prices), dtype=TICK_DTYPE)
+    records["timestamp"] = timestamps
+    records["symbol_id"] = symbol_ids
+    records["price"] = prices
+
+    # write to temp files then rename, so a crashed run never leaves a half-written cache behind
+    records.tofile(data_path + ".tmp")
+    os.replace(data_path + ".tmp", data_path)
+    meta = {"version": CACHE_VERSION,
+            "source": source if source is not None else _source_key(csv_path),
+            "rows": len(records),
+            "symbols": list(symbols)}
+    with open(meta_path + ".tmp", "w") as f:
+        json.dump(meta, f)
+    os.replace(meta_path + ".tmp", meta_path)
+    return records
+
+
+def read_ticks(csv_path: str):
+    """
+    memory-map the cached ticks for csv_path.
+    returns (timestamps ns, symbol_ids, prices, symbols) or None when the cache is missing or stale
+    """
+    data_path, meta_path = cache_paths(csv_path)
+    meta = _read_meta(meta_path)
+    if (meta is None or not os.path.exists(data_path)
+            or meta.get("version") != CACHE_VERSION
+            or meta.get("source") != _source_key(csv_path)):
+        return None
+
+    if meta["rows"] == 0:
+        records = np.empty(0, dtype=TICK_DTYPE)
+    else:
+        records = np.memmap(data_path, dtype=TICK_DTYPE, mode="r", shape=(meta["rows"],))
+    # field views on the memmap : pages are only read when touched
+    return records["timestamp"], records["symbol_id"], records["price"], meta["symbols"]
+
+
+def load_cached_ticks(csv_path: str, parse_csv):
+    """
+    parse_csv(csv_path) -> (timestamps ns, symbol_ids, prices, symbols) is only called on a cache miss
+    """
+    cached = read_ticks(csv_path)
+    if cached is not None:
+        return cached
+
+    # stat before parsing : the cache must describe the file as it was when parsing started
+    source = _source_key(csv_path)
+    timestamps, symbol_ids, prices, symbols = parse_csv(csv_path)
+    records = write_ticks(csv_path, timestamps, symbol_ids, prices, symbols, source=source)
+    cached = read_ticks(csv_path)
+    if cached is None:
+        # the csv changed during the parse : serve what was parsed, the next call rebuilds the cache
+        return records["timestamp"], records["symbol_id"], records["price"], list(symbols)
+    return cached